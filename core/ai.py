@@ -0,0 +1,571 @@
+import os
+import sys
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from core.env import load_env
+from core.settings import get_settings
+from core import resilience
+
+# API Configuration
+load_env()
+
+# Raised by every ask path (retries included) once the cancel event is set
+RequestCancelled = resilience.RequestCancelled
+
+class _AnyEvent:
+    """is_set()/wait() over several threading.Events, e.g. a race loser's and the caller's."""
+    def __init__(self, *events):
+        self.events = [e for e in events if e is not None]
+
+    def is_set(self):
+        return any(e.is_set() for e in self.events)
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while not self.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, 0.05))
+        return True
+
+# Default endpoints; config.json "endpoints" can override them (e.g. a local stand-in)
+PROVIDER_ENDPOINTS = {
+    "openai": "https://api.openai.com/v1/chat/completions",
+    "anthropic": "https://api.anthropic.com/v1/messages",
+}
+
+class AIClient:
+    """
+    Long-lived HTTP client owning one keep-alive connection pool per provider,
+    so consecutive ask_ai calls reuse the same TCP/TLS connection.
+    """
+    def __init__(self, pool_size=4):
+        self.pool_size = pool_size
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, provider):
+        """Returns the pooled session for a provider, creating it on first use."""
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[provider] = session
+            return session
+
+    def post(self, provider, url, **kwargs):
+        return self.session(provider).post(url, **kwargs)
+
+    def warm(self, provider, url):
+        """Opens (TCP + TLS) a connection to the provider and parks it in the pool."""
+        parsed = urlparse(url)
+        try:
+            self.session(provider).head(f"{parsed.scheme}://{parsed.netloc}/", timeout=10)
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """Forgets every pool; used in forked children so no TLS state is shared."""
+        with self._lock:
+            self._sessions = {}
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+_client = AIClient()
+if hasattr(os, "register_at_fork"):
+    # The lock may be held by another thread at fork time, so rebuild it too
+    os.register_at_fork(after_in_child=lambda: _client.__init__(_client.pool_size))
+
+def get_client():
+    """Returns the process-wide AIClient."""
+    return _client
+
+def _load_settings():
+    return get_settings().load()
+
+def endpoint_for(provider, settings):
+    """Provider URL, honouring config.json "endpoints" overrides."""
+    return (settings or {}).get("endpoints", {}).get(provider) or PROVIDER_ENDPOINTS.get(provider)
+
+def warm_provider(provider=None, background=True):
+    """
+    Pre-opens the connection to a provider (the active one by default) so
+    the first ask_ai call skips the TCP/TLS handshake. Only a remote provider
+    with a configured API key is warmed; the local model is never loaded
+    ahead of a request.
+    """
+    settings = _load_settings() or {}
+    provider = provider or settings.get("active_provider", "openai")
+    if provider == "local" or not settings.get("api_keys", {}).get(provider):
+        return False
+    url = endpoint_for(provider, settings)
+    if not url:
+        return False
+    if background:
+        threading.Thread(target=_client.warm, args=(provider, url), daemon=True).start()
+        return True
+    return _client.warm(provider, url)
+
+def _provider_settings(settings, provider=None):
+    """Returns (provider, api_key, model) or None after printing what is missing."""
+    if settings is None:
+        print("\n❌ Error: config.json not found.")
+        return None
+
+    provider = provider or settings.get("active_provider", "openai")
+    api_key = settings.get("api_keys", {}).get(provider)
+    model = settings.get("models", {}).get(provider)
+
+    # The local provider runs a GGUF model in-process and needs no key
+    if provider == "local":
+        from core.local_llm import local_options
+        return provider, None, local_options(settings)["model"]
+
+    if not api_key or not model:
+        print(f"\n❌ Error: Missing configuration for {provider}")
+        return None
+    return provider, api_key, model
+
+def _build_request(provider, api_key, model, prompt, system_prompt, stream=False, history=None):
+    """
+    Returns (headers, data) for a provider request. history (earlier
+    user/assistant messages) goes between the system prompt and the prompt;
+    passing it, even empty, marks the conversation prefix for prompt caching.
+    """
+    messages = list(history or []) + [{"role": "user", "content": prompt}]
+    # --- OpenAI Provider ---
+    if provider == "openai":
+        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        # OpenAI caches long identical prefixes automatically, the order keeps them stable
+        data = {
+            "model": model, 
+            "messages": [{"role": "system", "content": system_prompt}] + messages
+        }
+    # --- Anthropic Provider ---
+    elif provider == "anthropic":
+        headers = {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        data = {
+            "model": model,
+            "max_tokens": 4096,
+            "system": system_prompt,
+            "messages": messages
+        }
+        if history is not None:
+            # Cache breakpoints: the system prompt and the whole conversation so far
+            data["system"] = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            last = messages[-1]
+            messages[-1] = {"role": last["role"], "content": [
+                {"type": "text", "text": last["content"], "cache_control": {"type": "ephemeral"}}]}
+    else:
+        raise ValueError(f"Unknown provider '{provider}'")
+
+    if stream:
+        data["stream"] = True
+    return headers, data
+
+def _parse_response(provider, res):
+    """Extracts the completion text from a non-streaming JSON response."""
+    if provider == "openai":
+        return res['choices'][0]['message']['content']
+    return res['content'][0]['text']
+
+def _post(provider, url, headers, data, stream=False, cancel=None):
+    """
+    One provider request with rate limiting, jittered retries for 429/5xx and
+    dropped connections, and a circuit breaker (see core.resilience). Once
+    cancel is set no further attempt is sent.
+    """
+    def attempt():
+        try:
+            res = _client.post(provider, url, headers=headers, json=data, timeout=120, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise resilience.RetryableError(f"connection error: {e}")
+        resilience.limiter_for(provider).update_from_headers(res.headers)
+        if res.status_code in resilience.RETRYABLE_STATUS:
+            res.close()
+            raise resilience.RetryableError(f"HTTP {res.status_code}", resilience.retry_after_seconds(res.headers))
+        if res.status_code >= 400:
+            body = res.text[:300]
+            res.close()
+            raise RuntimeError(f"HTTP {res.status_code}: {body}")
+        return res
+    return resilience.call(provider, attempt, cancel=cancel)
+
+# --- STREAMING (Server-Sent Events) ---
+def iter_sse(lines):
+    """Yields (event, data) pairs from an iterable of SSE text lines."""
+    event, data_lines = None, []
+    for line in lines:
+        if line is None:
+            continue
+        line = line.rstrip("\r")
+        if line == "":
+            if data_lines:
+                yield event or "message", "\n".join(data_lines)
+            event, data_lines = None, []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            value = line[5:]
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield event or "message", "\n".join(data_lines)
+
+def iter_deltas(provider, events):
+    """Turns provider SSE events into plain text deltas."""
+    for event, data in events:
+        if provider == "openai":
+            if data.strip() == "[DONE]":
+                return
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(chunk["error"].get("message", chunk["error"]))
+            choices = chunk.get("choices") or []
+            text = (choices[0].get("delta") or {}).get("content") if choices else None
+            if text:
+                yield text
+        else:
+            payload = json.loads(data)
+            kind = payload.get("type", event)
+            if kind == "content_block_delta":
+                text = payload.get("delta", {}).get("text")
+                if text:
+                    yield text
+            elif kind == "message_stop":
+                return
+            elif kind == "error":
+                raise RuntimeError(payload.get("error", {}).get("message", payload))
+
+class StreamProgress:
+    """
+    Single live terminal line with time to first token and the rate of
+    streamed chunks. A chunk is one SSE delta (or one local token); remote
+    providers often pack several tokens into one, so it is not a token count.
+    """
+    def __init__(self, out=None, enabled=True):
+        self.out = out or sys.stderr
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.chunks = 0
+        self.chars = 0
+        self._last_draw = 0.0
+
+    def update(self, delta):
+        now = time.perf_counter()
+        if self.first_token is None:
+            self.first_token = now
+        self.chunks += 1
+        self.chars += len(delta)
+        if self.enabled and now - self._last_draw > 0.1:
+            self._last_draw = now
+            self.out.write(f"\r{self.line()}   ")
+            self.out.flush()
+
+    def stats(self):
+        now = time.perf_counter()
+        ttft = (self.first_token - self.started) if self.first_token else None
+        gen_time = (now - self.first_token) if self.first_token else 0
+        return {"ttft": ttft, "chunks": self.chunks, "chars": self.chars, "seconds": now - self.started,
+                "chunks_per_second": (self.chunks - 1) / gen_time if self.chunks > 1 and gen_time > 0 else None}
+
+    def line(self):
+        st = self.stats()
+        if st["ttft"] is None:
+            return f"⏳ Waiting for first token... {st['seconds']:.1f}s"
+        rate = f"{st['chunks_per_second']:.1f} chunks/s" if st["chunks_per_second"] else "-- chunks/s"
+        return f"⚡ TTFT {st['ttft']:.2f}s · {st['chunks']} chunks · {st['chars']} chars · {rate}"
+
+    def finish(self):
+        if self.enabled:
+            self.out.write(f"\r{self.line()} · done in {self.stats()['seconds']:.1f}s   \n")
+            self.out.flush()
+
+def stream_ai(prompt, system_prompt, show_progress=True, provider=None, history=None, cancel=None):
+    """
+    Streams a completion from the configured AI provider (or the given one),
+    yielding text deltas as they arrive. Errors are raised to the caller;
+    a set cancel event stops retries of the request (RequestCancelled).
+    """
+    settings = _load_settings()
+    resolved = _provider_settings(settings, provider)
+    if resolved is None:
+        return
+    provider, api_key, model = resolved
+    progress = StreamProgress(enabled=show_progress)
+
+    if provider == "local":
+        from core.local_llm import stream_chat
+        deltas = stream_chat(settings, system_prompt, prompt, history)
+        try:
+            for delta in deltas:
+                progress.update(delta)
+                yield delta
+        finally:
+            # Frees the model at once when the caller stops early (cancel, race loss)
+            deltas.close()
+        progress.finish()
+        return
+
+    url = endpoint_for(provider, settings)
+    headers, data = _build_request(provider, api_key, model, prompt, system_prompt, stream=True, history=history)
+
+    with _post(provider, url, headers, data, stream=True, cancel=cancel) as res:
+        res.encoding = "utf-8"
+        # chunk_size=None hands over bytes as they arrive instead of buffering 512
+        lines = res.iter_lines(chunk_size=None, decode_unicode=True)
+        try:
+            for delta in iter_deltas(provider, iter_sse(lines)):
+                progress.update(delta)
+                yield delta
+        except requests.RequestException as e:
+            # A stream cut midway is provider trouble, worth failing over for
+            raise resilience.RetryableError(f"stream interrupted: {e}")
+    progress.finish()
+
+def _other_remote_providers(settings, active):
+    """Configured remote providers (key and model set) other than the active one."""
+    order = settings.get("provider_order") or list(settings.get("api_keys", {}).keys())
+    return [p for p in order if p != active and p != "local" and
+            settings.get("api_keys", {}).get(p) and settings.get("models", {}).get(p)]
+
+def _failover_candidates(settings, active):
+    """Providers to try after the active one, when the "failover" preference is on."""
+    if not settings.get("preferences", {}).get("failover", False):
+        return []
+    return _other_remote_providers(settings, active)
+
+def _race_entrants(settings, active):
+    """The active provider plus one rival, when the "race" preference is on."""
+    if active == "local" or not settings.get("preferences", {}).get("race", False):
+        return []
+    rivals = _other_remote_providers(settings, active)
+    return [active, rivals[0]] if rivals else []
+
+def _race(entrants, prompt, system_prompt, history=None, stop=None):
+    """
+    Sends the request to every entrant over SSE and returns the first valid
+    answer; the slower streams are closed as soon as a winner is known.
+    """
+    from core import race
+
+    # Prompts that ask for the ---CODIGO--- format only accept answers that have it
+    needs_marker = "---CODIGO---" in (system_prompt or "")
+
+    def run_one(provider, cancel):
+        # A loser stops at its next delta, or before its next retry when it is backing off
+        halt = _AnyEvent(cancel, stop)
+        parts = []
+        deltas = stream_ai(prompt, system_prompt, show_progress=False, provider=provider, history=history,
+                           cancel=halt)
+        try:
+            for delta in deltas:
+                if halt.is_set():
+                    return None
+                parts.append(delta)
+        except RequestCancelled:
+            return None
+        finally:
+            # Closing the generator closes the HTTP stream of a losing provider
+            deltas.close()
+        return "".join(parts)
+
+    def is_valid(text):
+        return bool(text and text.strip()) and (not needs_marker or "---CODIGO---" in text)
+
+    names = " vs ".join(_provider_name(p) for p in entrants)
+    print(f"🏁 Racing {names}...")
+    try:
+        winner, text, seconds = race.race(entrants, run_one, is_valid)
+    finally:
+        if stop is not None and stop.is_set():
+            raise RequestCancelled("request cancelled")
+    race.record_race(race.size_bucket(prompt, system_prompt), entrants, winner, seconds)
+    print(f"🏁 {_provider_name(winner)} won in {seconds:.1f}s")
+    return text
+
+def _complete(settings, provider, prompt, system_prompt, stream, show_progress=True, history=None, cancel=None,
+              on_delta=None):
+    """Returns the completion text from one provider; errors are raised."""
+    _, api_key, model = _provider_settings(settings, provider)
+    if stream or provider == "local":
+        parts = []
+        deltas = stream_ai(prompt, system_prompt, show_progress=show_progress, provider=provider, history=history,
+                           cancel=cancel)
+        try:
+            for delta in deltas:
+                if cancel is not None and cancel.is_set():
+                    raise RequestCancelled("request cancelled")
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        finally:
+            deltas.close()
+        return "".join(parts)
+    url = endpoint_for(provider, settings)
+    headers, data = _build_request(provider, api_key, model, prompt, system_prompt, history=history)
+    res = _post(provider, url, headers, data, cancel=cancel).json()
+    return _parse_response(provider, res)
+
+def _provider_name(provider):
+    return "OpenAI" if provider == "openai" else provider.capitalize()
+
+def _ask(prompt, system_prompt, stream=None, use_cache=None, show_progress=None, history=None, cancel=None,
+         on_delta=None, allow_race=True):
+    """
+    ask_ai without the error swallowing: returns the text, returns None when
+    the provider is not configured (already reported) and raises the last
+    provider error once every candidate failed. allow_race=False ignores the
+    "race" preference.
+    """
+    settings = _load_settings()
+    resolved = _provider_settings(settings)
+    if resolved is None:
+        return None
+    provider, api_key, model = resolved
+    prefs = settings.get("preferences", {})
+
+    if stream is None:
+        stream = prefs.get("stream_output", False)
+    if use_cache is None:
+        use_cache = prefs.get("response_cache", False)
+    if on_delta is not None:
+        # The caller renders the text as it arrives, the progress line would get in the way
+        stream, show_progress = True, False
+    if show_progress is None:
+        # Local generation always reports its rate, it is the number that matters on-device
+        show_progress = stream or provider == "local"
+
+    cache = key = None
+    if use_cache:
+        from core.cache import get_cache, cache_key
+        cache = get_cache(prefs.get("response_cache_max_mb"))
+        key = cache_key(provider, model, system_prompt, prompt, history)
+        cached = cache.get(key)
+        if cached is not None:
+            print("⚡ Response served from local cache.")
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+
+    entrants = _race_entrants(settings, provider) if allow_race else []
+    if len(entrants) > 1:
+        try:
+            text = _race(entrants, prompt, system_prompt, history, stop=cancel)
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            print(f"\n❌ Race failed, no provider returned a valid answer: {e}")
+            raise
+        if cache is not None and text:
+            cache.put(key, text)
+        if on_delta is not None:
+            on_delta(text)
+        return text
+
+    candidates = [provider] + _failover_candidates(settings, provider)
+    for i, candidate in enumerate(candidates):
+        if i:
+            print(f"🔀 Failing over to {_provider_name(candidate)}...")
+            if on_delta is not None:
+                # What the failed provider streamed is void, the answer starts over
+                on_delta(None)
+        try:
+            text = _complete(settings, candidate, prompt, system_prompt, stream, show_progress, history, cancel,
+                             on_delta)
+            break
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            print(f"\n❌ {_provider_name(candidate)} API Error: {e}")
+            # Only provider-side trouble is worth trying the next provider for
+            last = i == len(candidates) - 1
+            if last or not isinstance(e, (resilience.RetryableError, resilience.CircuitOpenError)):
+                raise
+
+    if cache is not None and text:
+        cache.put(key, text)
+    return text
+
+def ask_ai(prompt, system_prompt, stream=None, use_cache=None, history=None, cancel=None, on_delta=None):
+    """
+    Sends a prompt to the configured AI provider and returns the response.
+    With stream (default: the opt-in "stream_output" preference) the text
+    arrives over SSE with live progress; the return value is the same full text.
+    With use_cache (default: the opt-in "response_cache" preference) identical
+    requests are answered from the local response cache; pass False to bypass.
+    Requests are paced and retried per provider; with the "failover"
+    preference the next configured provider answers when one is down.
+    With the "race" preference two providers get the request at once and the
+    first valid answer wins (results are kept in .odinos/race_stats.json).
+    history is an optional list of earlier {"role", "content"} messages for
+    multi-turn sessions; its prefix is marked for provider prompt caching.
+    cancel is an optional threading.Event: once set, a streaming request is
+    closed at the next token, a request waiting to be retried is not sent
+    again, and None is returned.
+    on_delta(text) is called with each piece of the answer as it arrives
+    (streaming is forced; cached and raced answers arrive in one piece).
+    on_delta(None) means the answer starts over (a provider failed midway
+    and the next one takes over): drop every piece received so far.
+    """
+    try:
+        return _ask(prompt, system_prompt, stream, use_cache, history=history, cancel=cancel, on_delta=on_delta)
+    except Exception:
+        # Already reported by _ask
+        return None
+
+def ask_ai_batch(prompts, system_prompt, max_concurrency=4, use_cache=None):
+    """
+    Runs many prompts concurrently (at most max_concurrency in flight) and
+    returns one dict per prompt, in input order:
+    {"prompt", "text", "error", "latency", "log"}. A failed item does not stop
+    the others. Requests share each provider's rate limiter and circuit breaker.
+    The "race" preference does not apply to batches.
+    Nothing is printed while the batch runs: what a request would print
+    (retries, failover, errors) is kept in its "log" for the caller to report.
+    """
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+    from core import console
+
+    def one(prompt):
+        started = time.perf_counter()
+        text, error = None, None
+        log = io.StringIO()
+        with console.captured(log):
+            try:
+                # Batches already keep the provider busy: racing would double every request
+                text = _ask(prompt, system_prompt, stream=False, use_cache=use_cache, show_progress=False,
+                            allow_race=False)
+                if text is None:
+                    error = "AI provider not configured"
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+        return {"prompt": prompt, "text": text, "error": error, "latency": time.perf_counter() - started,
+                "log": log.getvalue()}
+
+    prompts = list(prompts)
+    if not prompts:
+        return []
+    console.install()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(prompts)))) as pool:
+        return list(pool.map(one, prompts))
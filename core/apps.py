@@ -0,0 +1,400 @@
+import os
+import re
+import sys
+import time
+import subprocess
+from core.ai import ask_ai
+from core.services import is_server_active, start_static_server
+from core.patch import PATCH_FORMAT, PatchError, apply_reply, verify
+from core import html_sections
+from core.retrieval import estimate_tokens
+from core.settings import get_settings
+from core.speculative import Speculation
+from core.stream_parser import MarkerStreamParser, ProgressiveFile
+
+def parse_ai_response(ai_text):
+    """Splits an AI answer into (code_block, suggestion); code_block is None if missing."""
+    if not ai_text or "---CODIGO---" not in ai_text:
+        return None, ""
+    parts = ai_text.split("---SUGERENCIA---")
+    # Chatter before the marker is not part of the code
+    code_block = parts[0].split("---CODIGO---", 1)[-1].replace("---CODIGO---", "").strip()
+    # Remove markdown formatting if present
+    code_block = code_block.replace("```python", "").replace("```html", "").replace("```", "").strip()
+    suggestion = parts[1].strip() if len(parts) > 1 else ""
+    return code_block, suggestion
+
+def is_web_content(code_block):
+    lowered = code_block.lower()
+    return "<html" in lowered or "<!doctype" in lowered
+
+def project_name(filename):
+    """Folder name for a project: no dots or path separators, so it stays inside my_apps."""
+    name = re.sub(r"[^\w\- ]+", "_", filename.replace(".html", "")).strip(" _")
+    return name or "new_app"
+
+def project_file(filename, web):
+    """my_apps/<name>/index.html for web apps, my_apps/<name>/main.py otherwise."""
+    return os.path.join("my_apps", project_name(filename), "index.html" if web else "main.py")
+
+def save_project(code_block, filename):
+    """Writes the code to my_apps/<name>/index.html (web) or main.py. Returns the path."""
+    file_path = project_file(filename, is_web_content(code_block))
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    # Temp file + rename, an open preview never sees a half-written file
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(code_block)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+def _cancelled(cancel):
+    return cancel is not None and cancel.is_set()
+
+def _ask_options(cancel):
+    # Only streaming requests can be cut short
+    return {"cancel": cancel, "stream": True} if cancel is not None else {}
+
+def _improve_sections(code_block, improvement, cancel=None):
+    """Edits only the page sections relevant to the change; returns (new page text or None, suggestion)."""
+    sections = html_sections.split_html(code_block)
+    ids = html_sections.route_sections(sections, improvement,
+                                       ask_fn=lambda p, s: ask_ai(p, s, **(_ask_options(cancel) or {"stream": False})))
+    if _cancelled(cancel):
+        return None, ""
+    if not ids:
+        print("⚠️ Could not tell which part of the page to edit.")
+        return None, ""
+    labels = ", ".join(sections[i]["label"] for i in ids)
+    print(f"🧩 Editing {len(ids)} of {len(sections)} sections: {labels}")
+
+    reply = ask_ai(html_sections.build_section_prompt(sections, ids, improvement),
+                   "You are an expert developer. Return ONLY the changed ===SECTION n=== blocks and ---SUGERENCIA---.",
+                   **_ask_options(cancel))
+    section_text, _, suggestion = (reply or "").partition("---SUGERENCIA---")
+    if not html_sections.apply_sections(sections, section_text, set(ids)):
+        print("⚠️ No edited sections in the answer.")
+        return None, ""
+    new_code = html_sections.join_sections(sections)
+    error = verify(code_block, new_code)
+    if error:
+        print(f"⚠️ Section edit rejected ({error}).")
+        return None, ""
+    return new_code, suggestion.strip()
+
+def improve_code(code_block, improvement, cancel=None):
+    """
+    Asks for the change as search/replace blocks and applies them to
+    code_block, falling back to a full rewrite when the patch does not apply.
+    Large pages are edited section by section first, so they never have to
+    fit in the model context as a whole.
+    Returns (new code, suggestion) like parse_ai_response; the code is None
+    when nothing usable came back (also once the optional cancel event is set).
+    """
+    if is_web_content(code_block) and len(code_block) > html_sections.LARGE_APP_CHARS:
+        new_code, suggestion = _improve_sections(code_block, improvement, cancel)
+        if new_code is not None or _cancelled(cancel):
+            return new_code, suggestion
+    patch_prompt = (
+        f"Current code:\n\n{code_block}\n\n"
+        f"Requested change: {improvement}.\n{PATCH_FORMAT}\n"
+        "After the blocks, add ---SUGERENCIA--- with one next improvement."
+    )
+    reply = ask_ai(patch_prompt, "You are an expert developer. Return ONLY search/replace blocks and ---SUGERENCIA---.",
+                   **_ask_options(cancel))
+    if reply is None:
+        return None, ""
+    patch_text, _, suggestion = reply.partition("---SUGERENCIA---")
+    try:
+        new_code = apply_reply(code_block, patch_text)
+        print(f"🩹 Patch applied ({len(patch_text)} chars returned instead of {len(code_block)}).")
+        # Returned as is: re-parsing would strip ``` fences that belong to the code
+        return new_code, suggestion.strip()
+    except PatchError as e:
+        print(f"⚠️ Patch could not be applied ({e}). Requesting the full file...")
+    if _cancelled(cancel):
+        return None, ""
+
+    rewrite_prompt = (
+        f"Current code:\n\n{code_block}\n\n"
+        f"Requested change: {improvement}. "
+        f"Return the full updated code within ---CODIGO--- and a new ---SUGERENCIA---."
+    )
+    return parse_ai_response(ask_ai(rewrite_prompt,
+                                    "You are an expert developer. Return ONLY ---CODIGO--- and ---SUGERENCIA---.",
+                                    **_ask_options(cancel)))
+
+class AppSession:
+    """
+    One improvement conversation about a generated app: the current code plus
+    the message history. Turns only append to the history, so each request
+    starts with the previous one as an unchanged prefix that providers can
+    serve from their prompt cache; only the new change request is fresh input.
+    With the "speculate" preference the assistant's own suggestion starts
+    generating in the background while the user is still reading it.
+    """
+    SYSTEM_PROMPT = ("You are an expert developer improving one app over several turns. "
+                     "Follow the requested output format exactly.")
+    # Past this the conversation restarts from the current code
+    MAX_HISTORY_CHARS = 96000
+
+    def __init__(self, code_block, filename, suggestion=""):
+        self.code = code_block
+        self.filename = filename
+        self.suggestion = suggestion
+        self.history = []
+        self.speculation = None
+        # Estimated tokens of speculative work thrown away in this session
+        self.wasted_tokens = 0
+
+    def _history_chars(self):
+        return sum(len(m["content"]) for m in self.history)
+
+    def _turn(self, history, prompt, cancel=None):
+        """One request on top of history; returns (reply, new history)."""
+        reply = ask_ai(prompt, self.SYSTEM_PROMPT, history=history, **_ask_options(cancel))
+        if reply is None:
+            return None, history
+        return reply, history + [{"role": "user", "content": prompt}, {"role": "assistant", "content": reply}]
+
+    def propose(self, improvement, cancel=None):
+        """
+        Works out one change request without touching the session; returns
+        {"code", "suggestion", "history"} for accept(), or None.
+        """
+        if is_web_content(self.code) and len(self.code) > html_sections.LARGE_APP_CHARS:
+            # Large pages are edited by sections, each turn stands on its own
+            code_block, suggestion = improve_code(self.code, improvement, cancel)
+            if code_block is None:
+                return None
+            return {"code": code_block, "suggestion": suggestion, "history": []}
+
+        history = self.history
+        if not history or self._history_chars() > self.MAX_HISTORY_CHARS:
+            history = []
+            prompt = f"Current code:\n\n{self.code}\n\n"
+        else:
+            prompt = "Continue from the code as it is after your previous edits.\n"
+        prompt += (f"Requested change: {improvement}.\n{PATCH_FORMAT}\n"
+                   "After the blocks, add ---SUGERENCIA--- with one next improvement.")
+        reply, new_history = self._turn(history, prompt, cancel)
+        if reply is None:
+            return None
+        patch_text, _, suggestion = reply.partition("---SUGERENCIA---")
+        try:
+            new_code = apply_reply(self.code, patch_text)
+            print(f"🩹 Patch applied ({len(patch_text)} chars returned instead of {len(self.code)}).")
+            return {"code": new_code, "suggestion": suggestion.strip(), "history": new_history}
+        except PatchError as e:
+            print(f"⚠️ Patch could not be applied ({e}). Requesting the full file...")
+        if _cancelled(cancel):
+            return None
+
+        # Resynchronise the conversation on the real current code
+        reply, new_history = self._turn([], (
+            f"Current code:\n\n{self.code}\n\n"
+            f"Requested change: {improvement}. "
+            f"Return the full updated code within ---CODIGO--- and a new ---SUGERENCIA---."
+        ), cancel)
+        code_block, suggestion = parse_ai_response(reply)
+        if code_block is None:
+            return None
+        return {"code": code_block, "suggestion": suggestion, "history": new_history}
+
+    def accept(self, proposal):
+        self.code = proposal["code"]
+        self.suggestion = proposal["suggestion"]
+        self.history = proposal["history"]
+
+    def improve(self, improvement):
+        """Applies one change request to the code. Returns False when no new code came back."""
+        proposal = self.propose(improvement)
+        if proposal is None:
+            return False
+        self.accept(proposal)
+        return True
+
+    # --- SPECULATIVE PRE-GENERATION ---
+    def _speculation_cost(self):
+        """Rough token cost of one speculative turn (input code or last turn, plus the answer)."""
+        return estimate_tokens(self.code) * (1 if self.history else 2)
+
+    def speculate(self):
+        """Starts generating the current suggestion in the background, if allowed by the preferences."""
+        settings = get_settings()
+        if not self.suggestion or not settings.pref("speculate", False):
+            return None
+        budget = settings.pref("speculate_budget_tokens")
+        if self.wasted_tokens + self._speculation_cost() > budget:
+            return None
+        suggestion = self.suggestion
+        self.speculation = Speculation(lambda cancel: self.propose(suggestion, cancel))
+        return self.speculation
+
+    def take_speculation(self):
+        """
+        Waits for the speculative result of the accepted suggestion and applies
+        it. Returns False when it produced nothing; that request was already
+        paid for, so it is not sent again and counts against the budget.
+        """
+        speculation, self.speculation = self.speculation, None
+        ready = speculation.done()
+        if not ready:
+            print("⏳ The suggested change is already being generated, finishing it...")
+        try:
+            proposal = speculation.result()
+        except Exception as e:
+            print(f"⚠️ The suggested change failed: {e}")
+            proposal = None
+        if proposal is None:
+            self.wasted_tokens += self._speculation_cost()
+            return False
+        if ready:
+            print("⚡ The suggested change was generated while you were reading.")
+        self.accept(proposal)
+        return True
+
+    def discard_speculation(self):
+        """Cancels the speculative request (the user wants something else)."""
+        speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            speculation.cancel()
+            self.wasted_tokens += self._speculation_cost()
+
+def publish_project(code_block, filename):
+    """Saves the code, then opens web apps in the browser or runs Python scripts."""
+    base_folder = "my_apps"
+    file_path = save_project(code_block, filename)
+
+    # Handling Web Content (HTML)
+    if is_web_content(code_block):
+        print(f"\n✅ Project saved in: {file_path}")
+
+        # Server Management
+        if not is_server_active():
+            print(f"\n🤖 [ASSISTANT]: Local server is currently OFF.")
+            if input(f"👉 Would you like to start it? (y/n): ").lower() == 'y':
+                print("📡 Starting server in background (Port 8080)...")
+                start_static_server(8080)
+        
+        # Open in Browser (Android/Termux)
+        url = f"http://localhost:8080/{base_folder}/{project_name(filename)}/index.html"
+        print(f"🌍 Opening: {url}")
+        os.system(f'termux-open-url "{url}"')
+        
+    # Handling Logic Content (Python)
+    else:
+        print(f"\n🚀 Executing script at: {file_path}")
+        subprocess.run([sys.executable, file_path])
+
+def generate_app(prompt, system_prompt, filename):
+    """
+    Asks for a new app and writes my_apps/<name>/index.html while the tokens
+    arrive (to a hidden .partial file, renamed into place at the end); the
+    suggestion is printed live. Returns the full answer, or None on error.
+    """
+    state = {}
+
+    def on_code(text):
+        writer = state["file"]
+        if writer is None:
+            if not text.lstrip().startswith("<"):
+                return  # Scripts are saved once complete
+            writer = state["file"] = ProgressiveFile(project_file(filename, web=True))
+            if is_server_active():
+                print(f"👀 Live preview: http://localhost:8080/{writer.temp_path.replace(os.sep, '/')}")
+        writer.write(text)
+        now = time.monotonic()
+        if now - state["last_draw"] > 0.2:
+            state["last_draw"] = now
+            sys.stderr.write(f"\r📝 {writer.path}: {writer.lines + 1} lines, {writer.size / 1024:.1f} KB   ")
+            sys.stderr.flush()
+
+    def on_suggestion(text):
+        if not state["suggesting"]:
+            state["suggesting"] = True
+            sys.stderr.write("\n")
+            print("\n🤖 [ASSISTANT SUGGESTS]: ", end="")
+        print(text, end="", flush=True)
+
+    def start_over():
+        """Drops the partial file and parser state (also when a failover restarts the answer)."""
+        if state.get("file") is not None:
+            state["file"].abort()
+        if state.get("file") is not None or state.get("suggesting"):
+            print()
+        state.update(file=None, last_draw=0.0, suggesting=False,
+                     parser=MarkerStreamParser(on_code, on_suggestion))
+
+    def on_delta(delta):
+        if delta is None:
+            start_over()
+        else:
+            state["parser"].feed(delta)
+
+    start_over()
+    try:
+        ai_text = ask_ai(prompt, system_prompt, on_delta=on_delta)
+        if ai_text is None:
+            return None
+        state["parser"].finish()
+        print()
+
+        writer = state["file"]
+        if writer is not None:
+            code_block, _ = parse_ai_response(ai_text)
+            if code_block is not None and is_web_content(code_block):
+                writer.commit()
+                state["file"] = None
+        return ai_text
+    finally:
+        # Errors, cancels and Ctrl+C never leave a half-written app behind
+        if state["file"] is not None:
+            state["file"].abort()
+
+def process_and_execute(ai_text, filename="generated_app.html", suggestion_shown=False):
+    """
+    Handles AI output, saves files in project folders, and manages server status.
+    Accepted suggestions run as turns of one AppSession until the user stops.
+    With suggestion_shown the first suggestion was already printed (generate_app).
+    """
+    # 1. Parsing AI Response
+    code_block, suggestion = parse_ai_response(ai_text)
+    if code_block is None:
+        print("⚠️ No valid code block found in AI response.")
+        return
+
+    session = AppSession(code_block, filename, suggestion)
+    while True:
+        # 2. Saving into my_apps/<project> and opening/running it
+        publish_project(session.code, filename)
+
+        # 3. Iterative Improvement Loop
+        if not session.suggestion:
+            return
+        if not suggestion_shown:
+            print(f"\n🤖 [ASSISTANT SUGGESTS]: {session.suggestion}")
+        suggestion_shown = False
+        print("💡 (Type 'y' to accept, 'n' to exit, or type your OWN IMPROVEMENT directly)")
+        
+        session.speculate()
+        
+        user_input = input("👉 Your choice: ").strip()
+        accepted = user_input.lower() == 'y'
+        if not accepted:
+            session.discard_speculation()
+        if user_input.lower() == 'n' or not user_input:
+            print("👍 Returning to menu.")
+            return
+
+        improvement = session.suggestion if accepted else user_input
+        print(f"\n🧠 Applying: '{improvement}'...")
+
+        if session.speculation is not None:
+            improved = session.take_speculation()
+        else:
+            improved = session.improve(improvement)
+        if not improved:
+            print("⚠️ No valid code block found in AI response.")
+            return
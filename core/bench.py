@@ -0,0 +1,214 @@
+import os
+import sys
+import ast
+import json
+import time
+import string
+
+from core import gguf, local_llm
+
+# Local inference benchmark: every model in models/ x thread counts x context sizes
+STATE_DIR = ".odinos"
+REPORT_JSON = os.path.join(STATE_DIR, "local_bench.json")
+REPORT_MD = os.path.join(STATE_DIR, "local_bench.md")
+
+# The prompts we actually send: system prompts are read from these plugins
+PROMPT_SOURCES = {
+    "agent_mode": (os.path.join("plugins", "agent_mode.py"), "List the five largest files inside my_apps."),
+    "app_creator": (os.path.join("plugins", "app_creator.py"), "Build a tip calculator with a dark theme."),
+    "auto_envolve": (os.path.join("plugins", "auto_envolve.py"), "Create a plugin that shows disk usage per app."),
+}
+
+DEFAULT_THREADS = sorted({1, 2, max(1, (os.cpu_count() or 4) // 2), os.cpu_count() or 4})
+DEFAULT_CONTEXTS = [2048, 4096]
+MAX_TOKENS = 128
+
+def _literal_text(node):
+    """Text of a string constant, concatenation or f-string (placeholders dropped)."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(v.value for v in node.values if isinstance(v, ast.Constant))
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        left, right = _literal_text(node.left), _literal_text(node.right)
+        return left + right if left is not None and right is not None else None
+    return None
+
+def _drop_format_fields(text):
+    """Removes str.format placeholders ('{context}') from a prompt template."""
+    try:
+        return "".join(literal for literal, *_ in string.Formatter().parse(text))
+    except ValueError:
+        return text
+
+def extract_system_prompts(path):
+    """Statically reads every '*sys_prompt = ...' string (or template) assigned in a plugin."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    prompts = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id.lower().endswith("sys_prompt") for t in node.targets):
+            text = _literal_text(node.value)
+            if text:
+                prompts.append(" ".join(_drop_format_fields(text).split()))
+    return prompts
+
+def load_prompt_set():
+    """[(name, system_prompt, user_prompt)] built from the real plugin prompts."""
+    prompt_set = []
+    for name, (path, task) in PROMPT_SOURCES.items():
+        if not os.path.exists(path):
+            continue
+        prompts = extract_system_prompts(path)
+        if not prompts:
+            # The plugin no longer assigns a *sys_prompt string the benchmark can read
+            print(f"⚠️ No system prompt found in {path}")
+        for i, system_prompt in enumerate(prompts, 1):
+            prompt_set.append((f"{name}#{i}", system_prompt, task))
+    return prompt_set
+
+def _count_tokens(model, text):
+    if hasattr(model, "tokenize"):
+        return len(model.tokenize(text.encode("utf-8")))
+    return max(1, len(text) // 4)
+
+def _run_config(model_path, threads, n_ctx, prompt_set):
+    """Loads one model configuration and times every prompt (no prefix cache)."""
+    started = time.perf_counter()
+    model = local_llm.load_backend(model_path, n_ctx, threads, 0)
+    result = {"load_seconds": time.perf_counter() - started, "prompts": []}
+
+    for name, system_prompt, user_prompt in prompt_set:
+        if hasattr(model, "reset"):
+            model.reset()
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+        prompt_tokens = _count_tokens(model, system_prompt + "\n" + user_prompt)
+        t0 = time.perf_counter()
+        first = None
+        generated = 0
+        for chunk in model.create_chat_completion(messages=messages, stream=True, max_tokens=MAX_TOKENS):
+            choices = chunk.get("choices") or []
+            if choices and (choices[0].get("delta") or {}).get("content"):
+                first = first or time.perf_counter()
+                generated += 1
+        end = time.perf_counter()
+        pp_time = (first or end) - t0
+        gen_time = end - first if first else 0
+        result["prompts"].append({
+            "name": name, "prompt_tokens": prompt_tokens, "generated_tokens": generated,
+            "prompt_tps": prompt_tokens / pp_time if pp_time > 0 else None,
+            "gen_tps": (generated - 1) / gen_time if generated > 1 and gen_time > 0 else None,
+        })
+    return result
+
+def _isolated(fn, *args):
+    """
+    Runs fn in a forked child so each configuration gets its own peak RSS and
+    frees its weights afterwards. Falls back to in-process without fork.
+    """
+    if not (hasattr(os, "fork") and hasattr(os, "wait4")):
+        import resource
+        result = fn(*args)
+        result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return result
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            payload = {"ok": fn(*args)}
+        except BaseException as e:
+            payload = {"error": str(e) or e.__class__.__name__}
+        with os.fdopen(write_fd, "w", encoding="utf-8") as out:
+            json.dump(payload, out)
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "r", encoding="utf-8") as pipe:
+        raw = pipe.read()
+    _, _, rusage = os.wait4(pid, 0)
+    payload = json.loads(raw or '{"error": "benchmark child crashed"}')
+    if "error" in payload:
+        raise RuntimeError(payload["error"])
+    result = payload["ok"]
+    result["peak_rss"] = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return result
+
+def _mean(values):
+    values = [v for v in values if v]
+    return sum(values) / len(values) if values else None
+
+def run_benchmark(threads=None, contexts=None, models_dir=gguf.MODELS_DIR):
+    """Benchmarks every usable model and returns the report dict."""
+    prompt_set = load_prompt_set()
+    report = {"timestamp": time.time(), "cpu_count": os.cpu_count(), "max_tokens": MAX_TOKENS,
+              "prompts": [name for name, _, _ in prompt_set], "runs": [], "skipped": []}
+
+    for entry in gguf.list_models(models_dir):
+        if "error" in entry:
+            report["skipped"].append({"model": entry["path"], "reason": entry["error"]})
+            continue
+        for n_threads in threads or DEFAULT_THREADS:
+            for n_ctx in contexts or DEFAULT_CONTEXTS:
+                label = f"{os.path.basename(entry['path'])} t={n_threads} ctx={n_ctx}"
+                print(f"⏱️ {label} ...", flush=True)
+                run = {"model": entry["path"], "quantization": entry["quantization"],
+                       "threads": n_threads, "n_ctx": n_ctx}
+                try:
+                    result = _isolated(_run_config, entry["path"], n_threads, n_ctx, prompt_set)
+                    run.update(result)
+                    run["prompt_tps"] = _mean(p["prompt_tps"] for p in result["prompts"])
+                    run["gen_tps"] = _mean(p["gen_tps"] for p in result["prompts"])
+                except Exception as e:
+                    run["error"] = str(e)
+                    print(f"   ⚠️ {e}")
+                report["runs"].append(run)
+    return report
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+def format_markdown(report):
+    """Renders the report as a Markdown table."""
+    lines = ["# Local inference benchmark", "",
+             f"- Date: {time.strftime('%Y-%m-%d %H:%M', time.localtime(report['timestamp']))}",
+             f"- CPU cores: {report['cpu_count']} · max tokens per prompt: {report['max_tokens']}",
+             f"- Prompts: {', '.join(report['prompts']) or 'none'}", "",
+             "| Model | Quant | Threads | Ctx | Load (s) | Prompt tok/s | Gen tok/s | Peak RSS (MB) |",
+             "|---|---|---|---|---|---|---|---|"]
+    for run in report["runs"]:
+        if "error" in run:
+            lines.append(f"| {os.path.basename(run['model'])} | {run['quantization']} | {run['threads']} | "
+                         f"{run['n_ctx']} | ⚠️ {run['error']} | | | |")
+            continue
+        lines.append(f"| {os.path.basename(run['model'])} | {run['quantization']} | {run['threads']} | "
+                     f"{run['n_ctx']} | {_fmt(run['load_seconds'], '.2f')} | {_fmt(run['prompt_tps'], '.1f')} | "
+                     f"{_fmt(run['gen_tps'], '.1f')} | {_fmt(run['peak_rss'] / (1024 * 1024), '.0f')} |")
+    if report["skipped"]:
+        lines.append("")
+    for skipped in report["skipped"]:
+        lines.append(f"- Skipped {skipped['model']}: {skipped['reason']}")
+    return "\n".join(lines) + "\n"
+
+def save_report(report):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(REPORT_JSON, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(REPORT_MD, "w", encoding="utf-8") as f:
+        f.write(format_markdown(report))
+    return REPORT_JSON, REPORT_MD
+
+def _int_list(argv, flag):
+    """Parses '--flag 1,2,4' from argv."""
+    if flag in argv and argv.index(flag) + 1 < len(argv):
+        return [int(x) for x in argv[argv.index(flag) + 1].split(",") if x.strip().isdigit()]
+    return None
+
+def main(argv):
+    """CLI entry: python main.py --bench [--threads 2,4] [--ctx 2048,4096]"""
+    report = run_benchmark(_int_list(argv, "--threads"), _int_list(argv, "--ctx"))
+    json_path, md_path = save_report(report)
+    print("\n" + format_markdown(report))
+    print(f"📄 Reports: {json_path} and {md_path}")
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+# Content-addressed AI response cache (SQLite, zlib bodies, LRU eviction)
+STATE_DIR = ".odinos"
+CACHE_FILE = os.path.join(STATE_DIR, "ai_cache.sqlite3")
+DEFAULT_MAX_MB = 50
+
+def cache_key(provider, model, system_prompt, prompt, history=None):
+    """SHA-256 over everything that determines the completion."""
+    parts = [provider, model, system_prompt, prompt]
+    if history:
+        parts.append(history)
+    payload = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Stores compressed responses keyed by cache_key. When the stored bodies
+    exceed max_bytes the least recently used entries are evicted.
+    """
+    def __init__(self, path=CACHE_FILE, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _db(self):
+        # One connection per process: sqlite handles must not cross a fork
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,
+                    created REAL NOT NULL, last_used REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_used);
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _bump(self, db, name):
+        db.execute("INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key):
+        """Returns the cached text or None, counting the hit or miss."""
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            with db:
+                if row is None:
+                    self._bump(db, "misses")
+                    return None
+                db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._bump(db, "hits")
+            return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key, text):
+        """Stores a response, then evicts LRU entries beyond the size cap."""
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                           (key, body, len(body), now, now))
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    for old_key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        db.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                        self._bump(db, "evictions")
+                        total -= size
+
+    def stats(self):
+        """Entry count, stored bytes and hit/miss/eviction counters."""
+        with self._lock:
+            db = self._db()
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        return {"entries": entries, "bytes": size, "hits": counters.get("hits", 0),
+                "misses": counters.get("misses", 0), "evictions": counters.get("evictions", 0)}
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM responses")
+                db.execute("DELETE FROM counters")
+
+_cache = None
+
+def get_cache(max_mb=None):
+    """Returns the process-wide ResponseCache, applying the configured size cap."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    if max_mb:
+        _cache.max_bytes = int(max_mb * 1024 * 1024)
+    return _cache
+
+def get_cache_stats():
+    """Cache statistics for monitoring (None when no cache file exists yet)."""
+    if not os.path.exists(CACHE_FILE):
+        return None
+    return get_cache().stats()
@@ -0,0 +1,54 @@
+import sys
+import threading
+import contextlib
+
+# Per-thread console capture: background threads (batch requests, speculative
+# work) keep what they print in their own buffers instead of garbling the terminal
+
+class ThreadOutput:
+    """
+    sys.stdout/sys.stderr stand-in: writes of a capturing thread go to its
+    buffer, every other thread writes straight to the real stream.
+    """
+    def __init__(self, real):
+        self.real = real
+        self.buffers = {}
+
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident())
+        return buffer.write(text) if buffer is not None else self.real.write(text)
+
+    def __getattr__(self, name):
+        # flush, fileno, isatty... of the real stream (input() keeps readline)
+        return getattr(self.real, name)
+
+_lock = threading.Lock()
+
+def install():
+    """
+    Puts the stand-ins on sys.stdout/sys.stderr and leaves them there.
+    Call it from the main thread before starting capturing threads, so the
+    streams are never swapped while the user is typing at an input() prompt.
+    """
+    with _lock:
+        streams = []
+        for name in ("stdout", "stderr"):
+            stream = getattr(sys, name)
+            if not isinstance(stream, ThreadOutput):
+                stream = ThreadOutput(stream)
+                setattr(sys, name, stream)
+            streams.append(stream)
+        return streams
+
+@contextlib.contextmanager
+def captured(stdout, stderr=None):
+    """Routes what this thread prints to the stdout (and stderr) buffers while the block runs."""
+    ident = threading.get_ident()
+    streams = list(zip(install(), (stdout, stderr if stderr is not None else stdout)))
+    for stream, buffer in streams:
+        stream.buffers[ident] = buffer
+    try:
+        yield
+    finally:
+        for stream, _ in streams:
+            stream.buffers.pop(ident, None)
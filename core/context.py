@@ -0,0 +1,243 @@
+import os
+import ast
+import json
+import hashlib
+from core.retrieval import RetrievalIndex, iter_source_files, context_options, estimate_tokens
+
+STATE_DIR = ".odinos"
+MANIFEST_FILE = os.path.join(STATE_DIR, "context_manifest.json")
+SECTIONS_DIR = os.path.join(STATE_DIR, "context_sections")
+OUTLINES_DIR = os.path.join(STATE_DIR, "outlines")
+MANIFEST_VERSION = 1
+
+CONTEXT_EXTENSIONS = (".py", ".json")
+# Bigger files are cut to this size in the snapshot
+MAX_FILE_BYTES = 64 * 1024
+# Average line length above this means minified/generated content
+MINIFIED_LINE_LENGTH = 400
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except Exception:
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}, "output": None}
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def _output_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.abspath(path), st.st_mtime_ns, st.st_size]
+
+def is_minified(text):
+    lines = text.count("\n") + 1
+    return len(text) / lines > MINIFIED_LINE_LENGTH
+
+def render_section(path, raw):
+    """The snapshot section for one file; None skips the file (minified or unreadable)."""
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if is_minified(text):
+        return None
+    if len(raw) > MAX_FILE_BYTES:
+        text = raw[:MAX_FILE_BYTES].decode("utf-8", "ignore")
+        text += f"\n... [truncated, {len(raw) // 1024} KB file]"
+    return f"{'-'*48}\nFILE: {path}\n{'-'*48}\n{text}\n\n"
+
+def _section_path(digest):
+    return os.path.join(SECTIONS_DIR, digest + ".txt")
+
+def update_context_file(output_file="totalcode.txt", root=".", extensions=CONTEXT_EXTENSIONS):
+    """
+    Writes the whole-project snapshot for 'python main.py --context-snapshot'
+    (prompts are built from core.retrieval and outline(), never from this file). A manifest of
+    (path, mtime, size, hash) and a cache of rendered sections in .odinos mean
+    only changed files are read again, and an unchanged tree does not rewrite
+    the snapshot at all. Returns (output_file, number of changed files).
+    """
+    manifest = _load_manifest()
+    old_files = manifest["files"]
+    files, changed, touched = {}, 0, False
+    os.makedirs(SECTIONS_DIR, exist_ok=True)
+
+    for path in iter_source_files(root, extensions):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entry = old_files.get(path)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            files[path] = entry
+            continue
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            continue
+        digest = hashlib.sha1(raw).hexdigest()
+        section_exists = os.path.exists(_section_path(digest))
+        if entry and entry["sha1"] == digest and (section_exists or entry["skipped"]):
+            # Touched but identical content
+            files[path] = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            touched = True
+            continue
+        section = render_section(path, raw)
+        if section is not None and not section_exists:
+            _write_atomic(_section_path(digest), section)
+        files[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": digest,
+                       "skipped": section is None}
+        changed += 1
+
+    changed += len(set(old_files) - set(files))
+    output_path = os.path.join(root, output_file)
+    if not changed and manifest["output"] == _output_signature(output_path):
+        if touched:
+            manifest["files"] = files
+            _write_atomic(MANIFEST_FILE, json.dumps(manifest))
+        return output_file, 0
+
+    # Reassemble from cached sections; unchanged files are not read again
+    parts = []
+    for path, entry in files.items():
+        if entry["skipped"]:
+            continue
+        try:
+            with open(_section_path(entry["sha1"]), "r", encoding="utf-8") as f:
+                parts.append(f.read())
+        except OSError:
+            entry["mtime_ns"] = None  # Section lost, re-render on the next run
+    _write_atomic(output_path, "".join(parts))
+
+    # Drop sections no file refers to any more
+    live = {entry["sha1"] + ".txt" for entry in files.values()}
+    for name in os.listdir(SECTIONS_DIR):
+        if name not in live:
+            try:
+                os.remove(os.path.join(SECTIONS_DIR, name))
+            except OSError:
+                pass
+
+    manifest.update(files=files, output=_output_signature(output_path))
+    _write_atomic(MANIFEST_FILE, json.dumps(manifest))
+    return output_file, changed
+
+# --- API OUTLINES (public surface of a module) ---
+def _signature(node):
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+
+def _docstring_lines(node, indent):
+    doc = ast.get_docstring(node)
+    if not doc:
+        return []
+    lines = doc.splitlines()
+    if len(lines) == 1:
+        return [f'{indent}"""{lines[0]}"""']
+    return [f'{indent}"""'] + [f"{indent}{l}" if l else "" for l in lines] + [f'{indent}"""']
+
+def _outline_function(node, indent=""):
+    lines = [f"{indent}@{ast.unparse(d)}" for d in node.decorator_list]
+    lines.append(indent + _signature(node))
+    lines += _docstring_lines(node, indent + "    ")
+    lines.append(f"{indent}    ...")
+    return lines
+
+def _short_segment(source, node, limit=300):
+    text = ast.get_source_segment(source, node) or ""
+    return text if len(text) <= limit else text[:limit] + " ...  # truncated"
+
+def outline(source):
+    """
+    Renders a module as its API outline: imports, config and constants,
+    function/class signatures and docstrings, with bodies replaced by '...'.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return f"# (outline unavailable: syntax error on line {e.lineno})\n"
+    lines = _docstring_lines(tree, "")
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [t.id for t in targets if isinstance(t, ast.Name)]
+            if any(n == "config" or n.isupper() for n in names):
+                lines.append(_short_segment(source, node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lines += [""] + _outline_function(node)
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(b) for b in node.bases + node.keywords)
+            lines += [""] + [f"@{ast.unparse(d)}" for d in node.decorator_list]
+            lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+            lines += _docstring_lines(node, "    ")
+            methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                       and (not n.name.startswith("_") or n.name == "__init__")]
+            for method in methods:
+                lines += _outline_function(method, "    ")
+            if not methods and not ast.get_docstring(node):
+                lines.append("    ...")
+    return "\n".join(lines) + "\n"
+
+def get_outline(path):
+    """Outline of a file, cached in .odinos by content hash."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    cached = os.path.join(OUTLINES_DIR, hashlib.sha1(raw).hexdigest() + ".txt")
+    try:
+        with open(cached, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        pass
+    text = outline(raw.decode("utf-8", "replace"))
+    try:
+        os.makedirs(OUTLINES_DIR, exist_ok=True)
+        _write_atomic(cached, text)
+    except OSError:
+        pass
+    return text
+
+def build_outline_context(query, exclude=(), token_budget=None, settings=None):
+    """
+    Outlines of the project's Python modules, most relevant to the query
+    first, within the outline token budget. Excluded files (the one being
+    edited, sent in full elsewhere) are left out.
+    """
+    token_budget = token_budget or context_options(settings)["outline_budget"]
+    exclude = {os.path.join(".", os.path.relpath(p)) for p in exclude}
+
+    index = RetrievalIndex()
+    index.refresh()
+    ranked = []
+    for _, path, _ in index.search(query, top_k=len(index.chunks()), exclude=exclude):
+        if path.endswith(".py") and path not in ranked:
+            ranked.append(path)
+    ranked += [p for p in iter_source_files(".", (".py",)) if p not in exclude and p not in ranked]
+
+    sections, used = [], 0
+    for path in ranked:
+        try:
+            text = get_outline(path)
+        except OSError:
+            continue
+        section = f"{'-'*48}\nOUTLINE: {path}\n{'-'*48}\n{text}\n"
+        cost = estimate_tokens(section)
+        if used + cost > token_budget:
+            continue
+        sections.append(section)
+        used += cost
+    print(f"📚 Context: {len(sections)} of {len(ranked)} module outlines, ~{used} tokens (budget {token_budget})")
+    return "\n".join(sections)
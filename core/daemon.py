@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import threading
+
+# Resident OdinOS daemon: keeps plugins warm and attaches client terminals
+STATE_DIR = ".odinos"
+SOCKET_PATH = os.path.join(STATE_DIR, "odinos.sock")
+LOG_FILE = os.path.join(STATE_DIR, "daemon.log")
+
+# Background services hosted by the daemon process, keyed by (name, port)
+_services = {}
+
+def is_supported():
+    """The daemon needs Unix sockets, fd passing and fork (Linux/Termux)."""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+def _send(conn, message):
+    conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+def _connect(timeout=None):
+    """Connects to a running daemon, returning None when there is none."""
+    if not is_supported() or not os.path.exists(SOCKET_PATH):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(SOCKET_PATH)
+        return conn
+    except OSError:
+        conn.close()
+        return None
+
+def is_running():
+    """Checks whether a daemon is listening on the socket."""
+    conn = _connect(timeout=1)
+    if conn:
+        conn.close()
+        return True
+    return False
+
+# --- CLIENT SIDE ---
+def attach():
+    """
+    Hands this terminal (stdin/stdout/stderr) to a warm session in the daemon.
+    Returns the session exit code, or None when no daemon is running.
+    """
+    conn = _connect()
+    if conn is None:
+        return None
+
+    request = {"cmd": "attach", "cwd": os.getcwd(),
+               "env": {k: v for k, v in os.environ.items() if k in ("TERM", "COLUMNS", "LINES", "LANG")}}
+    try:
+        socket.send_fds(conn, [json.dumps(request).encode("utf-8")], [0, 1, 2])
+    except OSError:
+        conn.close()
+        return None
+
+    reader = conn.makefile("r", encoding="utf-8")
+    session_pid = None
+    code = 1
+
+    # Ctrl+C reaches this client (terminal foreground), so forward it to the session
+    def forward(signum, frame):
+        if session_pid:
+            try: os.kill(session_pid, signum)
+            except OSError: pass
+    previous = signal.signal(signal.SIGINT, forward)
+
+    try:
+        for line in reader:
+            msg = json.loads(line)
+            if "pid" in msg:
+                session_pid = msg["pid"]
+            elif "exit" in msg:
+                code = msg["exit"]
+                break
+    finally:
+        signal.signal(signal.SIGINT, previous)
+        conn.close()
+    return code
+
+def request_service(name, **options):
+    """Asks the daemon to host a background service. Returns False without a daemon."""
+    conn = _connect(timeout=5)
+    if conn is None:
+        return False
+    try:
+        _send(conn, {"cmd": "service", "name": name, "options": options})
+        reply = json.loads(conn.makefile("r", encoding="utf-8").readline() or "{}")
+        return bool(reply.get("ok"))
+    except Exception:
+        return False
+    finally:
+        conn.close()
+
+def stop():
+    """Asks a running daemon to shut down."""
+    conn = _connect(timeout=5)
+    if conn is None:
+        print("ℹ️ OdinOS daemon is not running.")
+        return False
+    with conn:
+        _send(conn, {"cmd": "stop"})
+    print("🛑 OdinOS daemon stopped.")
+    return True
+
+# --- DAEMON SIDE ---
+def _static_server(port=8080, directory="."):
+    """Preview HTTP server, the in-process twin of 'python -m http.server'."""
+    import functools
+    import http.server
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=os.path.abspath(directory))
+    http.server.ThreadingHTTPServer.allow_reuse_address = True
+    httpd = http.server.ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+# Service factories the daemon knows how to host. Only the shared preview
+# server lives here: servers a plugin owns for the length of its own run
+# (acornixOS, Help, NETphotoFLIX...) still start and stop inside the plugin.
+SERVICES = {"static": _static_server}
+
+def _start_service(name, options):
+    key = (name, options.get("port"))
+    if key in _services:
+        return True
+    factory = SERVICES.get(name)
+    if factory is None:
+        return False
+    try:
+        _services[key] = factory(**options)
+        print(f"📡 Service '{name}' started with {options}")
+        return True
+    except Exception as e:
+        print(f"⚠️ Service '{name}' failed: {e}")
+        return False
+
+def _run_session(conn, fds, request, session_fn):
+    """Forked child: adopts the client's terminal and runs one menu session."""
+    for target, fd in zip((0, 1, 2), fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+    os.environ.update(request.get("env", {}))
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    # If the client goes away, the session must not linger on its terminal
+    def watch_client():
+        try:
+            while conn.recv(1):
+                pass
+        except OSError:
+            pass
+        os._exit(1)
+    threading.Thread(target=watch_client, daemon=True).start()
+
+    code = 0
+    try:
+        os.chdir(request.get("cwd", os.getcwd()))
+        session_fn()
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    except BaseException as e:
+        print(f"\n❌ Session error: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        try: _send(conn, {"exit": code})
+        except OSError: pass
+        os._exit(code)
+
+def _handle(conn, session_fn, listener):
+    """Dispatches one client connection. Returns False when asked to stop."""
+    msg, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+    request = json.loads(msg.decode("utf-8") or "{}")
+    cmd = request.get("cmd")
+
+    if cmd == "attach" and len(fds) == 3:
+        pid = os.fork()
+        if pid == 0:
+            listener.close()
+            _run_session(conn, fds, request, session_fn)
+        for fd in fds:
+            os.close(fd)
+        _send(conn, {"pid": pid})
+    else:
+        for fd in fds:
+            os.close(fd)
+        if cmd == "service":
+            _send(conn, {"ok": _start_service(request.get("name"), request.get("options", {}))})
+        elif cmd == "stop":
+            return False
+    return True
+
+def _reap_children():
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+    except ChildProcessError:
+        pass
+
+def _detach():
+    """Classic double fork so the daemon survives the launching terminal."""
+    if os.fork():
+        return False
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    log = open(LOG_FILE, "a", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(log.fileno(), 1)
+    os.dup2(log.fileno(), 2)
+    sys.stdout = sys.stderr = log
+    return True
+
+def serve(session_fn, warm_up=None, foreground=False):
+    """
+    Starts the resident daemon. Plugins and core modules are imported once by
+    warm_up; every attached client gets a forked session that inherits them.
+    """
+    if not is_supported():
+        print("❌ Daemon mode needs Unix sockets with fd passing (Linux/Termux).")
+        return
+    if is_running():
+        print(f"ℹ️ OdinOS daemon already running on {SOCKET_PATH}")
+        return
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if os.path.exists(SOCKET_PATH):
+        os.remove(SOCKET_PATH)
+
+    if not foreground:
+        if not _detach():
+            print(f"🌳 OdinOS daemon starting (socket: {SOCKET_PATH}, log: {LOG_FILE})")
+            return
+
+    started = time.perf_counter()
+    if warm_up:
+        warm_up()
+    print(f"🔥 Warm-up finished in {time.perf_counter() - started:.2f}s (pid {os.getpid()})")
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(SOCKET_PATH)
+    listener.listen(8)
+    listener.settimeout(1.0)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        while True:
+            _reap_children()
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                conn.settimeout(None)
+                try:
+                    if not _handle(conn, session_fn, listener):
+                        break
+                except Exception as e:
+                    print(f"⚠️ Client error: {e}")
+    finally:
+        listener.close()
+        for httpd in _services.values():
+            httpd.shutdown()
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+        print("🛑 Daemon stopped.")
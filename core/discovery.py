@@ -0,0 +1,92 @@
+import os
+import ast
+import importlib.util
+
+# Static plugin discovery: reads 'config' and 'run' without executing plugin code
+PLUGIN_DIR = "plugins"
+
+def iter_entry_points(plugin_dir=PLUGIN_DIR):
+    """Yields (module_name, entry_point) for every single-file or folder plugin."""
+    if not os.path.exists(plugin_dir):
+        os.makedirs(plugin_dir)
+
+    for item in sorted(os.listdir(plugin_dir)):
+        # Skip hidden files, __init__, and cache
+        if item == "__init__.py" or item.startswith(".") or item == "__pycache__":
+            continue
+
+        item_path = os.path.join(plugin_dir, item)
+
+        # Single-file plugins (.py)
+        if item.endswith(".py"):
+            yield item[:-3], item_path
+        # Folder-based plugins (folder/main.py)
+        elif os.path.isdir(item_path):
+            main_file = os.path.join(item_path, "main.py")
+            if os.path.exists(main_file):
+                yield item, main_file
+
+def _binds(node, name):
+    """Checks whether a top-level statement binds the given name."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return node.name == name
+    if isinstance(node, ast.Assign):
+        return any(isinstance(t, ast.Name) and t.id == name for t in node.targets)
+    if isinstance(node, ast.AnnAssign):
+        return isinstance(node.target, ast.Name) and node.target.id == name
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return any((a.asname or a.name.split(".")[0]) == name for a in node.names)
+    return False
+
+def parse_plugin(source):
+    """
+    Statically extracts plugin metadata from source code.
+    Returns (config, has_run); config is None when absent and ... when it
+    is bound but not a literal (so the caller must import the module).
+    """
+    tree = ast.parse(source)
+    config = None
+    has_run = False
+
+    for node in tree.body:
+        if _binds(node, "run"):
+            has_run = True
+        if _binds(node, "config"):
+            value = node.value if isinstance(node, (ast.Assign, ast.AnnAssign)) else None
+            try:
+                config = ast.literal_eval(value) if value is not None else ...
+            except (ValueError, TypeError, SyntaxError):
+                config = ...
+    return config, has_run
+
+def _import_config(module_name, entry_point):
+    """Fallback: executes the plugin module to read a non-literal config."""
+    spec = importlib.util.spec_from_file_location(module_name, entry_point)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, "config", None), hasattr(module, "run")
+
+def read_plugin_info(module_name, entry_point):
+    """
+    Returns {"module_name", "entry_point", "config"} for a valid plugin, or the
+    same dict with an "error" key when the entry point is not a usable plugin.
+    """
+    info = {"module_name": module_name, "entry_point": entry_point}
+    try:
+        with open(entry_point, "r", encoding="utf-8") as f:
+            config, has_run = parse_plugin(f.read())
+        if config is ...:
+            config, has_run = _import_config(module_name, entry_point)
+    except Exception as e:
+        info["error"] = str(e)
+        return info
+
+    if isinstance(config, dict) and has_run:
+        info["config"] = config
+    else:
+        info["error"] = "missing 'config' or 'run'"
+    return info
+
+def discover_plugins(plugin_dir=PLUGIN_DIR):
+    """Lists every plugin in the directory using static extraction."""
+    return [read_plugin_info(name, path) for name, path in iter_entry_points(plugin_dir)]
@@ -0,0 +1,19 @@
+import os
+
+# Environment (.env) loading, deferred until something actually needs it
+_loaded = False
+
+def load_env():
+    """Loads the .env file once per process."""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+
+def __getattr__(name):
+    # API_KEY is resolved lazily so importing this module stays free
+    if name == "API_KEY":
+        load_env()
+        return os.getenv("OPENAI_API_KEY")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
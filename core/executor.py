@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import signal
+
+# Fork-server executor: the warm menu process forks one child per plugin run
+
+def is_supported():
+    """Forking needs os.fork and os.wait4 (Linux/Termux/macOS)."""
+    return hasattr(os, "fork") and hasattr(os, "wait4")
+
+def _peak_rss_bytes(rusage):
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    return rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+
+def _owns_terminal():
+    """True when our process group is in the terminal foreground, so Ctrl+C hits the child too."""
+    try:
+        return os.tcgetpgrp(sys.stdin.fileno()) == os.getpgrp()
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def _run_child(module):
+    """Forked child: runs the plugin on the inherited terminal, then exits."""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    code = 0
+    try:
+        module.run()
+    except KeyboardInterrupt:
+        code = 130
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    except BaseException as e:
+        print(f"\n❌ Critical Error running plugin: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Skip atexit/threads cleanup: everything the plugin leaked dies with us
+        os._exit(code)
+
+def run_plugin(module, isolated=True):
+    """
+    Runs module.run() and returns {"code", "wall", "peak_rss", "isolated"}.
+    With isolation the run happens in a forked child that inherits every
+    imported module, so threads, servers and memory it leaks vanish on exit.
+    So does every bit of process state the plugin builds up: the pooled
+    provider connections, a loaded local model and the rate limiter/circuit
+    breaker live for one plugin run only and start cold on the next.
+    """
+    started = time.perf_counter()
+
+    if not (isolated and is_supported()):
+        code = 0
+        try:
+            module.run()
+        except Exception as e:
+            print(f"\n❌ Critical Error running plugin: {e}")
+            code = 1
+        return {"code": code, "wall": time.perf_counter() - started, "peak_rss": None, "isolated": False}
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        _run_child(module)
+
+    # Ctrl+C belongs to the plugin while it runs; the menu must survive it.
+    # On our own terminal the kernel already delivers it to the child; in a
+    # daemon session it only reaches us (forwarded by the client), so pass it on.
+    def forward(signum, frame):
+        if not _owns_terminal():
+            try: os.kill(pid, signum)
+            except OSError: pass
+    previous = signal.signal(signal.SIGINT, forward)
+    try:
+        while True:
+            try:
+                _, status, rusage = os.wait4(pid, 0)
+                break
+            except InterruptedError:
+                continue
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+    code = os.waitstatus_to_exitcode(status)
+    return {"code": code, "wall": time.perf_counter() - started,
+            "peak_rss": _peak_rss_bytes(rusage), "isolated": True}
+
+def format_stats(label, stats):
+    """One-line summary of a plugin run for the menu header."""
+    text = f"⏱️ Last run: {label} · {stats['wall']:.1f}s"
+    if stats.get("peak_rss"):
+        text += f" · peak RSS {stats['peak_rss'] / (1024 * 1024):.1f} MB"
+    if stats["code"] not in (0, 130):
+        text += f" · exit {stats['code']}"
+    return text
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Resumable, parallel ranged downloader for model files
+SEGMENT_SIZE = 8 * 1024 * 1024
+READ_SIZE = 256 * 1024
+DEFAULT_WORKERS = 4
+
+def _progress_path(target):
+    return target + ".progress.json"
+
+def _part_path(target):
+    return target + ".part"
+
+def _preallocate(path, size):
+    """Reserves the whole file up front (real blocks where supported)."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    os.ftruncate(fd, size)
+            else:
+                os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+class _Progress:
+    """
+    Tracks finished byte ranges per segment in a sidecar JSON file, so an
+    interrupted download resumes where each segment stopped.
+    """
+    def __init__(self, target, url, size, segments):
+        self.path = _progress_path(target)
+        self.lock = threading.Lock()
+        self.state = {"url": url, "size": size, "done": [0] * len(segments)}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("url") == url and saved.get("size") == size and len(saved.get("done", [])) == len(segments):
+                self.state = saved
+        except Exception:
+            pass
+        self._last_save = 0.0
+
+    def done(self, index):
+        return self.state["done"][index]
+
+    def advance(self, index, nbytes):
+        with self.lock:
+            self.state["done"][index] += nbytes
+            if time.monotonic() - self._last_save > 1.0:
+                self._save()
+
+    def total_done(self):
+        return sum(self.state["done"])
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class _StreamingHasher:
+    """
+    SHA-256 that follows the contiguous downloaded prefix: segments finish out
+    of order, so bytes are hashed as soon as everything before them is on disk
+    (still in the page cache), instead of a second pass after the download.
+    """
+    def __init__(self, path, progress, segments):
+        self.sha = hashlib.sha256()
+        self.path = path
+        self.progress = progress
+        self.segments = segments
+        self.offset = 0
+        self.cond = threading.Condition()
+        self.finished = False
+
+    def contiguous_end(self):
+        end = 0
+        for index, (start, stop) in enumerate(self.segments):
+            done = self.progress.done(index)
+            end = start + done
+            if start + done < stop:
+                break
+        return end
+
+    def notify(self):
+        with self.cond:
+            self.cond.notify()
+
+    def run(self):
+        # Unbuffered: a read-ahead buffer would keep zeros from ranges not written yet
+        with open(self.path, "rb", buffering=0) as f:
+            while True:
+                with self.cond:
+                    end = self.contiguous_end()
+                    while end <= self.offset and not self.finished:
+                        self.cond.wait(0.5)
+                        end = self.contiguous_end()
+                    if end <= self.offset and self.finished:
+                        return
+                f.seek(self.offset)
+                while self.offset < end:
+                    chunk = f.read(min(READ_SIZE, end - self.offset))
+                    if not chunk:
+                        break
+                    self.sha.update(chunk)
+                    self.offset += len(chunk)
+
+    def stop(self):
+        with self.cond:
+            self.finished = True
+            self.cond.notify()
+
+def _probe(session, url):
+    """Returns (size, supports_ranges) using a 1-byte ranged GET."""
+    res = session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=30)
+    res.close()
+    if res.status_code == 206 and "/" in res.headers.get("Content-Range", ""):
+        return int(res.headers["Content-Range"].rsplit("/", 1)[1]), True
+    res.raise_for_status()
+    return int(res.headers.get("Content-Length", 0)), False
+
+def _download_segment(session, url, path, index, segment, progress, hasher, errors, stop, retries=5):
+    start, stop_at = segment
+    for attempt in range(retries):
+        offset = start + progress.done(index)
+        if offset >= stop_at or stop.is_set():
+            return
+        try:
+            headers = {"Range": f"bytes={offset}-{stop_at - 1}"}
+            with session.get(url, headers=headers, stream=True, timeout=60) as res:
+                if res.status_code == 200:
+                    # No Range support: the body starts at byte 0 again, skip what is already on disk
+                    skip = offset
+                elif res.status_code == 206:
+                    skip = 0
+                else:
+                    res.raise_for_status()
+                    raise RuntimeError(f"unexpected HTTP {res.status_code}")
+                with open(path, "r+b") as f:
+                    f.seek(offset)
+                    for chunk in res.iter_content(READ_SIZE):
+                        if stop.is_set():
+                            return
+                        if skip:
+                            dropped = min(skip, len(chunk))
+                            chunk, skip = chunk[dropped:], skip - dropped
+                        chunk = chunk[:stop_at - offset]
+                        if not chunk:
+                            continue
+                        f.write(chunk)
+                        f.flush()
+                        offset += len(chunk)
+                        progress.advance(index, len(chunk))
+                        hasher.notify()
+                        if offset >= stop_at:
+                            break
+            if offset >= stop_at:
+                return
+        except Exception as e:
+            if attempt == retries - 1:
+                errors.append(f"segment {index}: {e}")
+                return
+            stop.wait(min(2 ** attempt, 10))
+
+def download(url, target, sha256=None, workers=DEFAULT_WORKERS, session=None, show_progress=True):
+    """
+    Downloads url to target with parallel HTTP Range requests into a
+    preallocated '.part' file, resuming from the sidecar progress file.
+    The SHA-256 is computed while streaming and checked before the final rename
+    (after a resume, the already downloaded prefix is hashed once more).
+    Returns the hex digest.
+    """
+    import requests
+    session = session or requests.Session()
+    size, ranged = _probe(session, url)
+    if not size:
+        raise RuntimeError("server did not report the file size")
+
+    part = _part_path(target)
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    if not ranged:
+        workers = 1
+    segment_size = max(SEGMENT_SIZE, -(-size // max(1, workers * 4))) if ranged else size
+    segments = [(s, min(s + segment_size, size)) for s in range(0, size, segment_size)]
+
+    progress = _Progress(target, url, size, segments)
+    if not ranged or not os.path.exists(part) or os.path.getsize(part) != size:
+        progress.state["done"] = [0] * len(segments)
+    _preallocate(part, size)
+
+    hasher = _StreamingHasher(part, progress, segments)
+    hash_thread = threading.Thread(target=hasher.run, daemon=True)
+    hash_thread.start()
+
+    errors = []
+    pending = [i for i, (s, e) in enumerate(segments) if s + progress.done(i) < e]
+    lock = threading.Lock()
+    # Set on Ctrl+C (or any error here): workers stop before their next write
+    stop = threading.Event()
+
+    def worker():
+        while True:
+            with lock:
+                if not pending or errors or stop.is_set():
+                    return
+                index = pending.pop(0)
+            _download_segment(session, url, part, index, segments[index], progress, hasher, errors, stop)
+
+    threads = [threading.Thread(target=worker, name="fetch-segment", daemon=True)
+               for _ in range(min(workers, len(pending)))]
+    started = time.monotonic()
+    resumed_from = progress.total_done()
+    try:
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            if show_progress:
+                done = progress.total_done()
+                rate = (done - resumed_from) / max(time.monotonic() - started, 1e-6)
+                print(f"\r📥 {done / size * 100:5.1f}% · {done / 1048576:.1f}/{size / 1048576:.1f} MB · "
+                      f"{rate / 1048576:.2f} MB/s   ", end="", flush=True)
+            time.sleep(0.5)
+    finally:
+        stop.set()
+        for t in threads:
+            # A worker blocked on a read writes nothing more once it wakes up
+            t.join(timeout=5)
+        progress.save()
+        hasher.stop()
+        hash_thread.join()
+        if show_progress:
+            print()
+
+    if errors or progress.total_done() < size:
+        raise RuntimeError("download incomplete, run again to resume: " + "; ".join(errors))
+
+    digest = hasher.sha.hexdigest()
+    if sha256 and digest.lower() != sha256.lower():
+        # Corrupt data cannot be resumed, start over next time
+        os.remove(part)
+        progress.remove()
+        raise RuntimeError(f"SHA-256 mismatch: expected {sha256}, got {digest}")
+
+    os.replace(part, target)
+    progress.remove()
+    return digest
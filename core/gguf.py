@@ -0,0 +1,191 @@
+import os
+import json
+import mmap
+import struct
+
+# GGUF header reader and model catalog: parses metadata only, never the weights
+STATE_DIR = ".odinos"
+CATALOG_FILE = os.path.join(STATE_DIR, "model_catalog.json")
+MODELS_DIR = "models"
+MODEL_EXTENSIONS = (".gguf", ".bin")
+
+# GGUF metadata value types -> struct format (fixed-size ones)
+_SCALARS = {0: "<B", 1: "<b", 2: "<H", 3: "<h", 4: "<I", 5: "<i", 6: "<f", 7: "<?", 10: "<Q", 11: "<q", 12: "<d"}
+_STRING, _ARRAY = 8, 9
+
+# llama.cpp file types (general.file_type)
+FILE_TYPES = {
+    0: "F32", 1: "F16", 2: "Q4_0", 3: "Q4_1", 7: "Q8_0", 8: "Q5_0", 9: "Q5_1", 10: "Q2_K",
+    11: "Q3_K_S", 12: "Q3_K_M", 13: "Q3_K_L", 14: "Q4_K_S", 15: "Q4_K_M", 16: "Q5_K_S",
+    17: "Q5_K_M", 18: "Q6_K", 19: "IQ2_XXS", 20: "IQ2_XS", 21: "Q2_K_S", 22: "IQ3_XS",
+    23: "IQ3_XXS", 24: "IQ1_S", 25: "IQ4_NL", 26: "IQ3_S", 27: "IQ3_M", 28: "IQ2_S",
+    29: "IQ2_M", 30: "IQ4_XS", 31: "IQ1_M", 32: "BF16",
+}
+
+# ggml tensor types, used when general.file_type is missing
+TENSOR_TYPES = {
+    0: "F32", 1: "F16", 2: "Q4_0", 3: "Q4_1", 6: "Q5_0", 7: "Q5_1", 8: "Q8_0", 9: "Q8_1",
+    10: "Q2_K", 11: "Q3_K", 12: "Q4_K", 13: "Q5_K", 14: "Q6_K", 15: "Q8_K", 16: "IQ2_XXS",
+    17: "IQ2_XS", 18: "IQ3_XXS", 19: "IQ1_S", 20: "IQ4_NL", 21: "IQ3_S", 22: "IQ2_S",
+    23: "IQ4_XS", 24: "I8", 25: "I16", 26: "I32", 27: "I64", 28: "F64", 29: "IQ1_M", 30: "BF16",
+}
+
+# Pre-GGUF ggml containers (no longer loadable by llama.cpp)
+_LEGACY_MAGICS = {b"lmgg": "GGML", b"fmgg": "GGMF", b"tjgg": "GGJT"}
+
+class _Reader:
+    """Sequential little-endian reader over a memory map."""
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def unpack(self, fmt):
+        value = struct.unpack_from(fmt, self.buf, self.pos)[0]
+        self.pos += struct.calcsize(fmt)
+        return value
+
+    def string(self):
+        length = self.unpack("<Q")
+        raw = self.buf[self.pos:self.pos + length]
+        self.pos += length
+        return raw.decode("utf-8", errors="replace")
+
+    def skip_string(self):
+        self.pos += 8 + struct.unpack_from("<Q", self.buf, self.pos)[0]
+
+    def value(self, vtype, keep_arrays):
+        if vtype in _SCALARS:
+            return self.unpack(_SCALARS[vtype])
+        if vtype == _STRING:
+            return self.string()
+        if vtype == _ARRAY:
+            item_type = self.unpack("<I")
+            count = self.unpack("<Q")
+            if keep_arrays:
+                return [self.value(item_type, True) for _ in range(count)]
+            # Skip big arrays (tokenizer vocab) without decoding them
+            if item_type in _SCALARS:
+                self.pos += count * struct.calcsize(_SCALARS[item_type])
+            elif item_type == _STRING:
+                for _ in range(count):
+                    self.skip_string()
+            else:
+                for _ in range(count):
+                    self.value(item_type, False)
+            return f"<array of {count}>"
+        raise ValueError(f"unknown GGUF value type {vtype}")
+
+def read_header(path):
+    """
+    Parses a GGUF file's header, metadata and tensor table through mmap.
+    Returns a dict with architecture, parameters, quantization, context length
+    and tensor count; raises ValueError for files that are not GGUF.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("empty file (placeholder, model not downloaded)")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            magic = buf[:4]
+            if magic in _LEGACY_MAGICS:
+                raise ValueError(f"legacy {_LEGACY_MAGICS[magic]} format, convert it to GGUF")
+            if magic != b"GGUF":
+                raise ValueError("not a GGUF file")
+
+            r = _Reader(buf)
+            r.pos = 4
+            version = r.unpack("<I")
+            count_fmt = "<I" if version == 1 else "<Q"
+            tensor_count = r.unpack(count_fmt)
+            kv_count = r.unpack(count_fmt)
+
+            metadata = {}
+            for _ in range(kv_count):
+                key = r.string()
+                vtype = r.unpack("<I")
+                metadata[key] = r.value(vtype, keep_arrays=False)
+
+            parameters = 0
+            type_counts = {}
+            for _ in range(tensor_count):
+                r.skip_string()
+                n_dims = r.unpack("<I")
+                elements = 1
+                for _ in range(n_dims):
+                    elements *= r.unpack(count_fmt)
+                ttype = r.unpack("<I")
+                r.pos += 8  # data offset
+                parameters += elements
+                type_counts[ttype] = type_counts.get(ttype, 0) + elements
+
+    arch = metadata.get("general.architecture", "unknown")
+    if "general.file_type" in metadata:
+        quant = FILE_TYPES.get(metadata["general.file_type"], f"type {metadata['general.file_type']}")
+    elif type_counts:
+        dominant = max(type_counts, key=type_counts.get)
+        quant = TENSOR_TYPES.get(dominant, f"type {dominant}")
+    else:
+        quant = "unknown"
+
+    return {
+        "format": f"GGUF v{version}",
+        "name": metadata.get("general.name", ""),
+        "architecture": arch,
+        "parameters": parameters,
+        "quantization": quant,
+        "context_length": metadata.get(f"{arch}.context_length"),
+        "tensor_count": tensor_count,
+    }
+
+def human_params(n):
+    """1543714304 -> '1.5B'."""
+    for unit, size in (("B", 1e9), ("M", 1e6), ("K", 1e3)):
+        if n >= size:
+            return f"{n / size:.1f}{unit}"
+    return str(n)
+
+def describe(entry):
+    """One-line summary of a catalog entry for pick lists."""
+    if "error" in entry:
+        return f"⚠️ {entry['error']}"
+    ctx = entry.get("context_length") or "?"
+    return (f"{entry['architecture']} · {human_params(entry['parameters'])} params · "
+            f"{entry['quantization']} · ctx {ctx} · {entry['tensor_count']} tensors")
+
+def _load_catalog():
+    try:
+        with open(CATALOG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def list_models(models_dir=MODELS_DIR):
+    """
+    Returns catalog entries for every model file in models_dir. Headers are
+    only re-read when a file's mtime or size changed since the last listing.
+    """
+    if not os.path.isdir(models_dir):
+        return []
+    catalog = _load_catalog()
+    updated = {}
+    for name in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, name)
+        if not name.endswith(MODEL_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        st = os.stat(path)
+        entry = catalog.get(path)
+        if not entry or entry.get("mtime") != st.st_mtime_ns or entry.get("size") != st.st_size:
+            try:
+                entry = read_header(path)
+            except (ValueError, struct.error, OSError) as e:
+                entry = {"error": str(e)}
+            entry.update(path=path, mtime=st.st_mtime_ns, size=st.st_size)
+        updated[path] = entry
+
+    if updated != catalog:
+        try:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(CATALOG_FILE, "w", encoding="utf-8") as f:
+                json.dump(updated, f, indent=2)
+        except OSError:
+            pass
+    return list(updated.values())
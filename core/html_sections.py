@@ -0,0 +1,123 @@
+import re
+from core.retrieval import bm25_scores, tokenize, estimate_tokens
+
+# Pages above this size are edited section by section
+LARGE_APP_CHARS = 12000
+# Sections are cut at line boundaries once they grow past this size
+MAX_SECTION_CHARS = 3000
+# Most tokens of selected sections sent in one edit request
+SECTION_BUDGET_TOKENS = 6000
+
+BLOCK_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+# Good places to cut: top-level JS declarations, CSS rules, opening body elements
+CUT_RE = {
+    "script": re.compile(r"^\s{0,4}(function\s|class\s|const\s|let\s|var\s|async\s+function\s|//)"),
+    "style": re.compile(r"^\s{0,4}[^\s{}][^{]*\{\s*$"),
+    "markup": re.compile(r"^\s{0,8}<(?!/)"),
+}
+SECTION_RE = re.compile(r"===SECTION (\d+)===\n(.*?)\n?===END SECTION===", re.DOTALL)
+
+def _cut(text, kind):
+    """Splits one region into pieces of about MAX_SECTION_CHARS at good line boundaries."""
+    if len(text) <= MAX_SECTION_CHARS:
+        return [text]
+    pieces, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        if size >= MAX_SECTION_CHARS and CUT_RE[kind].match(line) or size >= MAX_SECTION_CHARS * 2:
+            pieces.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+def split_html(html):
+    """
+    Splits a page into contiguous sections (each <style>, each <script> and
+    the markup between them, big ones cut further). Joining the texts of
+    all sections gives back the page unchanged.
+    """
+    regions, pos = [], 0
+    for match in BLOCK_RE.finditer(html):
+        if match.start() > pos:
+            regions.append(("markup", html[pos:match.start()]))
+        regions.append((match.group(1).lower(), match.group(0)))
+        pos = match.end()
+    if pos < len(html):
+        regions.append(("markup", html[pos:]))
+
+    sections, line = [], 1
+    for kind, text in regions:
+        pieces = _cut(text, kind)
+        for i, piece in enumerate(pieces):
+            part = f" part {i + 1}/{len(pieces)}" if len(pieces) > 1 else ""
+            newlines = piece.count("\n")
+            last = line + newlines - (1 if piece.endswith("\n") else 0)
+            sections.append({"id": len(sections), "kind": kind, "text": piece,
+                             "label": f"{kind}{part} (lines {line}-{max(line, last)})"})
+            line += newlines
+    return sections
+
+def join_sections(sections):
+    return "".join(s["text"] for s in sections)
+
+def route_sections(sections, request, token_budget=SECTION_BUDGET_TOKENS, ask_fn=None):
+    """
+    Picks the section ids relevant to a change request: BM25 over the
+    sections first; when nothing matches, a short AI call on the section
+    index (labels and first lines) decides.
+    """
+    terms = sorted(set(tokenize(request)))
+    scores = bm25_scores([_term_counts(s["text"]) for s in sections],
+                         [max(1, len(tokenize(s["text"]))) for s in sections], terms) if terms else []
+    ranked = [i for i in sorted(range(len(sections)), key=lambda i: scores[i], reverse=True) if scores[i] > 0]
+
+    if not ranked and ask_fn is not None:
+        index = "\n".join(f"{s['id']}: {s['label']} | {' '.join(s['text'].split())[:100]}" for s in sections)
+        reply = ask_fn(
+            f"Page sections:\n{index}\n\nChange request: {request}\n"
+            "Which section ids must be edited? Answer only with comma-separated ids.",
+            "You route edit requests to the relevant parts of a web page. Answer only with ids."
+        ) or ""
+        ranked = [int(i) for i in re.findall(r"\d+", reply) if int(i) < len(sections)]
+
+    chosen, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(sections[i]["text"])
+        if used + cost > token_budget:
+            continue
+        chosen.append(i)
+        used += cost
+    return sorted(set(chosen))
+
+def _term_counts(text):
+    counts = {}
+    for term in tokenize(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+def build_section_prompt(sections, ids, request):
+    """Prompt with only the chosen sections, wrapped in ===SECTION n=== markers."""
+    outline = "\n".join(f"{s['id']}: {s['label']}" for s in sections)
+    chosen = "\n".join(f"===SECTION {i}===\n{sections[i]['text']}\n===END SECTION===" for i in ids)
+    return (
+        f"The page is split into sections:\n{outline}\n\n"
+        f"Sections you may edit:\n{chosen}\n\n"
+        f"Requested change: {request}.\n"
+        "Return ONLY the sections you changed, complete, in the same ===SECTION n=== / "
+        "===END SECTION=== markers. Do not return unchanged sections. "
+        "After them, add ---SUGERENCIA--- with one next improvement."
+    )
+
+def apply_sections(sections, reply, allowed_ids):
+    """Replaces the returned sections in place; returns the number of sections updated."""
+    updated = 0
+    for sid, text in SECTION_RE.findall(reply or ""):
+        sid = int(sid)
+        if sid in allowed_ids:
+            original = sections[sid]["text"]
+            # Keep the original trailing newline, the markers swallow it
+            sections[sid]["text"] = text + ("\n" if original.endswith("\n") and not text.endswith("\n") else "")
+            updated += 1
+    return updated
@@ -0,0 +1,94 @@
+import os
+import threading
+
+# Resident local-model provider (GGUF via llama-cpp-python, CPU only)
+DEFAULT_MODEL = os.path.join("models", "qwen2.5-1.5b.gguf")
+DEFAULT_OPTIONS = {"threads": max(1, (os.cpu_count() or 4) // 2), "n_ctx": 4096,
+                   "max_tokens": 2048, "prompt_cache_mb": 256}
+
+# Loaded models stay resident for the life of the process, keyed by load options
+_models = {}
+_lock = threading.Lock()
+# One generation at a time per model: it keeps its own KV state
+_generation_locks = {}
+_backend_factory = None
+
+def set_backend_factory(factory):
+    """
+    Replaces the model loader: factory(model_path, n_ctx, n_threads, cache_bytes)
+    must return an object with create_chat_completion(messages, stream, max_tokens)
+    like llama_cpp.Llama. Used to plug in a tiny stub model (None restores llama.cpp).
+    """
+    global _backend_factory
+    _backend_factory = factory
+    _models.clear()
+    _generation_locks.clear()
+
+def _llama_cpp_factory(model_path, n_ctx, n_threads, cache_bytes):
+    try:
+        from llama_cpp import Llama, LlamaRAMCache
+    except ImportError:
+        raise RuntimeError("Local provider needs llama-cpp-python (pip install llama-cpp-python)")
+    llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads,
+                n_threads_batch=n_threads, n_gpu_layers=0, use_mmap=True, verbose=False)
+    # Keeps KV states for earlier prompt prefixes (e.g. the long fixed system
+    # prompts of Agent Mode and App Creator) so they are not evaluated again
+    if cache_bytes:
+        llm.set_cache(LlamaRAMCache(capacity_bytes=cache_bytes))
+    return llm
+
+def load_backend(model_path, n_ctx, n_threads, cache_bytes=0):
+    """Loads a model without keeping it resident (benchmarks, one-off runs)."""
+    factory = _backend_factory or _llama_cpp_factory
+    return factory(model_path, n_ctx, n_threads, cache_bytes)
+
+def local_options(settings):
+    """Merges the config.json "local" section over the defaults."""
+    options = dict(DEFAULT_OPTIONS)
+    options.update((settings or {}).get("local", {}))
+    options["model"] = (settings or {}).get("models", {}).get("local") or DEFAULT_MODEL
+    return options
+
+def _model_key(model_path, n_ctx, n_threads):
+    return os.path.abspath(model_path), n_ctx, n_threads
+
+def get_model(model_path, n_ctx, n_threads, prompt_cache_mb=0):
+    """Returns the resident model for these options, loading it on first use."""
+    key = _model_key(model_path, n_ctx, n_threads)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if _backend_factory is None and not os.path.getsize(model_path):
+                raise RuntimeError(f"{model_path} is an empty placeholder; download the model first")
+            print(f"🧠 Loading local model {os.path.basename(model_path)} ({n_threads} threads)...")
+            model = load_backend(model_path, n_ctx, n_threads, int(prompt_cache_mb * 1024 * 1024))
+            _models[key] = model
+        return model
+
+def stream_chat(settings, system_prompt, prompt, history=None):
+    """
+    Yields text deltas from the local model for a system + user prompt (after
+    history). The model is held until the generator ends, so a caller that
+    stops early must close() it to let the next generation in.
+    """
+    options = local_options(settings)
+    if not os.path.exists(options["model"]):
+        raise RuntimeError(f"Local model not found: {options['model']}")
+    model = get_model(options["model"], options["n_ctx"], options["threads"], options["prompt_cache_mb"])
+    with _lock:
+        busy = _generation_locks.setdefault(_model_key(options["model"], options["n_ctx"], options["threads"]),
+                                            threading.Lock())
+    messages = ([{"role": "system", "content": system_prompt}] + list(history or []) +
+                [{"role": "user", "content": prompt}])
+    with busy:
+        chunks = model.create_chat_completion(messages=messages, stream=True, max_tokens=options["max_tokens"])
+        try:
+            for chunk in chunks:
+                choices = chunk.get("choices") or []
+                text = (choices[0].get("delta") or {}).get("content") if choices else None
+                if text:
+                    yield text
+        finally:
+            # Stops llama.cpp generating tokens nobody will read
+            if hasattr(chunks, "close"):
+                chunks.close()
@@ -0,0 +1,130 @@
+import difflib
+
+SEARCH_MARK = "<<<<<<< SEARCH"
+DIVIDER = "======="
+REPLACE_MARK = ">>>>>>> REPLACE"
+
+# Minimum similarity for a SEARCH block that does not match exactly
+FUZZY_THRESHOLD = 0.9
+
+PATCH_FORMAT = (
+    "Do NOT return the whole file. Return only the edits as one or more blocks:\n"
+    f"{SEARCH_MARK}\n<exact lines copied from the current code>\n{DIVIDER}\n<new lines>\n{REPLACE_MARK}\n"
+    "Each SEARCH part must match the current code exactly and only once; keep it short "
+    "(a few lines around the change). An empty SEARCH part adds the new lines at the end "
+    "(in a web page: just before </body>)."
+)
+
+class PatchError(Exception):
+    """A patch block could not be located or the result failed verification."""
+
+def parse_blocks(text):
+    """Returns the (search, replace) pairs found in a model reply."""
+    blocks, search, replace, state = [], [], [], None
+    for line in (text or "").splitlines():
+        marker = line.strip()
+        if marker == SEARCH_MARK:
+            search, replace, state = [], [], "search"
+        elif marker == DIVIDER and state == "search":
+            state = "replace"
+        elif marker == REPLACE_MARK and state == "replace":
+            blocks.append(("\n".join(search), "\n".join(replace)))
+            state = None
+        elif state == "search":
+            search.append(line)
+        elif state == "replace":
+            replace.append(line)
+    return blocks
+
+def _indent(line):
+    return line[:len(line) - len(line.lstrip())]
+
+def _locate(lines, search_lines):
+    """(start, end) of the lines matching search_lines, ignoring whitespace, then fuzzily."""
+    n = len(search_lines)
+    wanted = [l.strip() for l in search_lines]
+    stripped = [l.strip() for l in lines]
+    hits = [i for i in range(len(lines) - n + 1) if stripped[i:i + n] == wanted]
+    if len(hits) == 1:
+        return hits[0], hits[0] + n
+    if len(hits) > 1:
+        raise PatchError(f"SEARCH block matches {len(hits)} places:\n{search_lines[0]}")
+
+    target = "\n".join(wanted)
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    matcher.set_seq2(target)
+    best, best_ratio = None, FUZZY_THRESHOLD
+    for i in range(len(lines) - n + 1):
+        matcher.set_seq1("\n".join(stripped[i:i + n]))
+        if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= best_ratio:
+            best, best_ratio = i, ratio
+    if best is None:
+        raise PatchError(f"SEARCH block not found:\n{search_lines[0]}")
+    return best, best + n
+
+def _append(source, text):
+    """Adds text at the end of a file; in a web page it goes inside the body, not after </html>."""
+    lowered = source.lower()
+    for tag in ("</body>", "</html>"):
+        at = lowered.rfind(tag)
+        if at >= 0:
+            line_start = source.rfind("\n", 0, at) + 1
+            # Keep the closing tag on its own line with its indentation
+            at = line_start if not source[line_start:at].strip() else at
+            return source[:at] + text.strip("\n") + "\n" + source[at:]
+    return source.rstrip("\n") + "\n" + text + "\n"
+
+def apply_blocks(source, blocks):
+    """Applies search/replace blocks in order; raises PatchError if one cannot be placed."""
+    if not blocks:
+        raise PatchError("no patch blocks in the reply")
+    for search, replace in blocks:
+        if not search.strip():
+            source = _append(source, replace)
+            continue
+        count = source.count(search)
+        if count == 1:
+            source = source.replace(search, replace)
+            continue
+        if count > 1:
+            raise PatchError(f"SEARCH block matches {count} places:\n{search.splitlines()[0]}")
+
+        lines = source.split("\n")
+        search_lines = search.strip("\n").split("\n")
+        start, end = _locate(lines, search_lines)
+        new_lines = replace.split("\n") if replace else []
+        # Re-indent when the model got the indentation of the anchor wrong
+        have, got = _indent(lines[start]), _indent(search_lines[0])
+        if have != got:
+            new_lines = [have + l[len(got):] if l.startswith(got) else l for l in new_lines]
+        source = "\n".join(lines[:start] + new_lines + lines[end:])
+    return source
+
+def verify(old, new):
+    """Sanity checks for a patched file; returns an error message or None."""
+    if not new.strip():
+        return "patched file is empty"
+    lowered_old, lowered_new = old.lower(), new.lower()
+    if "<html" in lowered_old or "<!doctype" in lowered_old:
+        for tag in ("script", "style"):
+            if lowered_new.count(f"<{tag}") != lowered_new.count(f"</{tag}>"):
+                return f"unbalanced <{tag}> tags"
+        if "</html>" in lowered_old and "</html>" not in lowered_new:
+            return "closing </html> tag lost"
+        return None
+    try:
+        compile(new, "<patched>", "exec")
+    except SyntaxError as e:
+        return f"syntax error on line {e.lineno}: {e.msg}"
+    return None
+
+def apply_reply(source, reply):
+    """Parses, applies and verifies a patch reply; returns the new source or raises PatchError."""
+    new = apply_blocks(source, parse_blocks(reply))
+    error = verify(source, new)
+    if error:
+        raise PatchError(error)
+    return new
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import importlib
+import importlib.util
+
+# Startup profiler: times heavy imports and every plugin's exec_module
+STATE_DIR = ".odinos"
+PROFILE_FILE = os.path.join(STATE_DIR, "startup_profile.json")
+REPORT_FILE = os.path.join(STATE_DIR, "startup_profile.txt")
+TRACE_FILE = os.path.join(STATE_DIR, "startup_trace.json")
+
+HEAVY_DEPENDENCIES = ("requests", "dotenv", "cgi", "zipfile")
+
+# Import-time regression budgets for what plugins actually run at import:
+# a "from core.utils import name" also loads the module behind that name
+IMPORT_BUDGETS_MS = {
+    "import core.utils": 30,
+    "from core.utils import is_server_active": 30,
+    "from core.utils import get_settings": 30,
+}
+
+def _timed(fn):
+    """Runs fn and returns (start, duration) in seconds, plus any error."""
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except BaseException as e:
+        error = str(e) or e.__class__.__name__
+    return start, time.perf_counter() - start, error
+
+def _import_plugin(module_name, entry_point):
+    spec = importlib.util.spec_from_file_location(module_name, entry_point)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+def profile_startup(entry_points):
+    """
+    Measures the import time of each heavy dependency, then the wall time of
+    exec_module for each (module_name, entry_point). Returns the profile dict.
+    """
+    origin = time.perf_counter()
+    events = []
+
+    for dep in HEAVY_DEPENDENCIES:
+        preloaded = dep in sys.modules
+        start, duration, error = _timed(lambda: importlib.import_module(dep))
+        events.append({"name": dep, "kind": "dependency", "start": start - origin,
+                       "duration": duration, "error": error, "preloaded": preloaded})
+
+    for module_name, entry_point in entry_points:
+        start, duration, error = _timed(lambda: _import_plugin(module_name, entry_point))
+        events.append({"name": module_name, "kind": "plugin", "entry_point": entry_point,
+                       "start": start - origin, "duration": duration, "error": error})
+
+    return {"timestamp": time.time(), "python": sys.version.split()[0], "events": events}
+
+def load_profile_history():
+    """Returns {"current": ..., "previous": ...} from disk (values may be None)."""
+    try:
+        with open(PROFILE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return {"current": data.get("current"), "previous": data.get("previous")}
+    except Exception:
+        return {"current": None, "previous": None}
+
+def _chrome_trace(profile):
+    """Converts a profile to the Chrome trace-event format (chrome://tracing, Perfetto)."""
+    return {"traceEvents": [
+        {"name": ev["name"], "cat": ev["kind"], "ph": "X", "pid": 1,
+         "tid": 1 if ev["kind"] == "dependency" else 2,
+         "ts": round(ev["start"] * 1e6), "dur": round(ev["duration"] * 1e6),
+         "args": {k: v for k, v in ev.items() if k in ("entry_point", "error", "preloaded") and v}}
+        for ev in profile["events"]
+    ], "displayTimeUnit": "ms"}
+
+def ranked(profile, previous=None, kind=None):
+    """
+    Returns events sorted slowest first, each with a "delta" (seconds) against
+    the same event in the previous profile, or None when it is new.
+    """
+    before = {(ev["kind"], ev["name"]): ev["duration"] for ev in (previous or {}).get("events", [])}
+    rows = []
+    for ev in profile.get("events", []):
+        if kind and ev["kind"] != kind:
+            continue
+        old = before.get((ev["kind"], ev["name"]))
+        rows.append(dict(ev, delta=None if old is None else ev["duration"] - old))
+    return sorted(rows, key=lambda r: r["duration"], reverse=True)
+
+def format_report(profile, previous=None):
+    """Renders the ranked plain-text report."""
+    lines = ["OdinOS startup profile",
+             time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(profile["timestamp"])), ""]
+    total = sum(ev["duration"] for ev in profile["events"])
+    for i, row in enumerate(ranked(profile, previous), 1):
+        delta = "  (new)" if row["delta"] is None else f"  ({row['delta'] * 1000:+.1f} ms)"
+        note = f"  ⚠️ {row['error']}" if row.get("error") else (" (already loaded)" if row.get("preloaded") else "")
+        lines.append(f"{i:>3}. {row['duration'] * 1000:8.1f} ms  [{row['kind']}] {row['name']}{delta}{note}")
+    lines += ["", f"Total: {total * 1000:.1f} ms"]
+    return "\n".join(lines)
+
+def save_profile(profile):
+    """Writes the JSON history (keeping the previous run), report and Chrome trace."""
+    history = load_profile_history()
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(PROFILE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"current": profile, "previous": history["current"]}, f, indent=2)
+    report = format_report(profile, history["current"])
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        f.write(report + "\n")
+    with open(TRACE_FILE, "w", encoding="utf-8") as f:
+        json.dump(_chrome_trace(profile), f)
+    return report
+
+def get_startup_profile(limit=None, kind="plugin"):
+    """Ranked rows (slowest first, with deltas) from the last saved profile."""
+    history = load_profile_history()
+    if not history["current"]:
+        return []
+    rows = ranked(history["current"], history["previous"], kind)
+    return rows[:limit] if limit else rows
+
+def _import_statement(target):
+    return target if target.startswith(("import ", "from ")) else f"import {target}"
+
+def measure_import(target, runs=3):
+    """
+    Best-of-N wall time (ms) of an import statement (or module name) in a
+    fresh interpreter, so modules already loaded here do not hide the cost.
+    """
+    import subprocess
+    code = f"import time; t = time.perf_counter(); {_import_statement(target)}; print(time.perf_counter() - t)"
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=os.getcwd())
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed")
+        ms = float(out.stdout.strip()) * 1000
+        best = ms if best is None else min(best, ms)
+    return best
+
+def loaded_modules(target):
+    """Names of the modules an import statement (or module name) loads in a fresh interpreter."""
+    import subprocess
+    code = f"import sys; before = set(sys.modules); {_import_statement(target)}; print(' '.join(sorted(set(sys.modules) - before)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=os.getcwd())
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed")
+    return set(out.stdout.split())
+
+def check_import_budgets(budgets=None):
+    """Measures each budgeted import; returns True when all stay within budget."""
+    ok = True
+    for target, budget in (budgets or IMPORT_BUDGETS_MS).items():
+        ms = measure_import(target)
+        within = ms <= budget
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {_import_statement(target)}: {ms:.1f} ms (budget {budget} ms)")
+    return ok
@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import queue
+import threading
+
+STATE_DIR = ".odinos"
+RACE_STATS_FILE = os.path.join(STATE_DIR, "race_stats.json")
+
+# Prompt size buckets (system + user prompt characters); latency depends mostly on this
+SIZE_BUCKETS = [(2000, "small"), (8000, "medium"), (32000, "large")]
+
+_stats_lock = threading.Lock()
+
+def size_bucket(prompt, system_prompt=""):
+    """Names the prompt size bucket used to group race results."""
+    size = len(prompt or "") + len(system_prompt or "")
+    for limit, name in SIZE_BUCKETS:
+        if size < limit:
+            return name
+    return "xlarge"
+
+def race(entrants, run_fn, is_valid):
+    """
+    Runs run_fn(provider, cancel_event) for every entrant at once and returns
+    (winner, text, seconds) for the first result accepted by is_valid. The
+    losers get cancel_event set and are not waited for. Raises the last error
+    when no entrant produced a valid result.
+    """
+    results = queue.Queue()
+    cancel = threading.Event()
+    started = time.perf_counter()
+
+    def runner(provider):
+        try:
+            results.put((provider, run_fn(provider, cancel), None))
+        except Exception as e:
+            results.put((provider, None, e))
+
+    for provider in entrants:
+        threading.Thread(target=runner, args=(provider,), daemon=True).start()
+
+    last_error = None
+    for _ in entrants:
+        provider, text, error = results.get()
+        if error is None and is_valid(text):
+            cancel.set()
+            return provider, text, time.perf_counter() - started
+        last_error = error or ValueError(f"{provider} returned an invalid response")
+    raise last_error
+
+def load_race_stats():
+    """Persisted race results: {bucket: {provider: {"races", "wins", "win_seconds"}}}."""
+    try:
+        with open(RACE_STATS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def record_race(bucket, entrants, winner, seconds):
+    """Adds one race result to the persisted stats (atomic write)."""
+    with _stats_lock:
+        stats = load_race_stats()
+        per_bucket = stats.setdefault(bucket, {})
+        for provider in entrants:
+            entry = per_bucket.setdefault(provider, {"races": 0, "wins": 0, "win_seconds": 0.0})
+            entry["races"] += 1
+            if provider == winner:
+                entry["wins"] += 1
+                entry["win_seconds"] = round(entry["win_seconds"] + seconds, 3)
+        try:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            tmp = RACE_STATS_FILE + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp, RACE_STATS_FILE)
+        except OSError:
+            pass
+
+def fastest_provider(bucket, candidates=None):
+    """
+    The provider that historically wins most often for this size bucket
+    (ties broken by average winning time), or None without data.
+    """
+    ranked = []
+    for provider, entry in load_race_stats().get(bucket, {}).items():
+        if candidates is not None and provider not in candidates:
+            continue
+        if not entry["races"]:
+            continue
+        avg = entry["win_seconds"] / entry["wins"] if entry["wins"] else float("inf")
+        ranked.append((-entry["wins"] / entry["races"], avg, provider))
+    return min(ranked)[2] if ranked else None
@@ -0,0 +1,111 @@
+import os
+import json
+import importlib.util
+from core.discovery import iter_entry_points, read_plugin_info
+
+# On-disk plugin registry: lets the menu redraw without re-importing plugins
+STATE_DIR = ".odinos"
+REGISTRY_FILE = os.path.join(STATE_DIR, "plugin_registry.json")
+
+# Modules imported during this session, keyed by entry point path
+_modules = {}
+
+def _fingerprint(path):
+    """Returns (mtime, size) used to detect changes in a plugin entry point."""
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+def _category_for(label, categories):
+    """Finds the menu category whose label list contains the plugin label."""
+    for cat_name, labels in (categories or {}).items():
+        if label in labels:
+            return cat_name
+    return None
+
+def _serializable_config(cfg):
+    """Keeps only the JSON-friendly values of a plugin config (label, icon, ...)."""
+    return {k: v for k, v in cfg.items() if isinstance(v, (str, int, float, bool))}
+
+def load_registry():
+    """Reads the registry file, returning an empty registry if missing or corrupt."""
+    try:
+        with open(REGISTRY_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def save_registry(registry):
+    """Writes the registry file."""
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(REGISTRY_FILE, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=2, ensure_ascii=False)
+    except Exception as e:
+        print(f"⚠️ Could not save plugin registry: {e}")
+
+def import_plugin(module_name, entry_point):
+    """Imports (or re-imports) a plugin module and keeps it for this session."""
+    spec = importlib.util.spec_from_file_location(module_name, entry_point)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _modules[entry_point] = (_fingerprint(entry_point), module)
+    return module
+
+def _inspect(module_name, entry_point):
+    """Reads the registry record of a changed plugin without importing it."""
+    record = read_plugin_info(module_name, entry_point)
+    if "config" in record:
+        record["config"] = _serializable_config(record["config"])
+    return record
+
+def refresh(categories=None):
+    """
+    Syncs the registry with the plugins directory and returns the valid entries.
+    New or changed entry points are parsed statically; nothing is imported here.
+    """
+    registry = load_registry()
+    updated = {}
+    changed = False
+
+    for module_name, entry_point in iter_entry_points():
+        try:
+            mtime, size = _fingerprint(entry_point)
+        except OSError:
+            continue
+
+        record = registry.get(entry_point)
+        if not record or record.get("mtime") != mtime or record.get("size") != size:
+            record = _inspect(module_name, entry_point)
+            record["mtime"], record["size"] = mtime, size
+            changed = True
+
+        # Categories live in main.py, so re-evaluate them on every refresh
+        label = record.get("config", {}).get("label", "")
+        category = _category_for(label, categories)
+        if "category" not in record or record["category"] != category:
+            record["category"] = category
+            changed = True
+
+        updated[entry_point] = record
+
+    if changed or set(updated) != set(registry):
+        save_registry(updated)
+
+    entries = []
+    for record in updated.values():
+        if "error" in record:
+            print(f"⚠️ Error loading {record['module_name']}: {record['error']}")
+        else:
+            entries.append(record)
+
+    # Default alphabetical sort by label for the 'Others' category
+    return sorted(entries, key=lambda x: x["config"].get("label", "").lower())
+
+def load_module(entry):
+    """Returns the plugin module for a registry entry, importing it only if needed."""
+    entry_point = entry["entry_point"]
+    cached = _modules.get(entry_point)
+    if cached and cached[0] == _fingerprint(entry_point):
+        return cached[1]
+    return import_plugin(entry["module_name"], entry_point)
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+# Per-provider pacing (token bucket), retry with jittered backoff and circuit breaker
+STATE_DIR = ".odinos"
+STATUS_FILE = os.path.join(STATE_DIR, "provider_status.json")
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+class RetryableError(Exception):
+    """A failure worth retrying (429, 5xx, dropped connection)."""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is known to be down."""
+
+class RequestCancelled(Exception):
+    """A request was abandoned because its cancel event was set."""
+
+def _parse_duration(value):
+    """Parses OpenAI reset values ('1s', '6m0s', '120ms') or plain seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, number = 0.0, ""
+    i = 0
+    while i < len(value):
+        ch = value[i]
+        if ch.isdigit() or ch == ".":
+            number += ch
+        elif value.startswith("ms", i):
+            total += float(number or 0) / 1000
+            number = ""
+            i += 1
+        elif ch in "hms":
+            total += float(number or 0) * {"h": 3600, "m": 60, "s": 1}[ch]
+            number = ""
+        i += 1
+    return total
+
+def _parse_reset(value):
+    """Seconds until a reset given as a duration or an RFC 3339 / HTTP date."""
+    if not value:
+        return None
+    if "T" in value or "," in value:
+        try:
+            if "T" in value:
+                from datetime import datetime
+                moment = datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+            else:
+                moment = parsedate_to_datetime(value).timestamp()
+            return max(0.0, moment - time.time())
+        except (ValueError, TypeError):
+            return None
+    return _parse_duration(value)
+
+def retry_after_seconds(headers):
+    """Reads Retry-After (seconds or HTTP date) from response headers."""
+    return _parse_reset(headers.get("retry-after")) if headers else None
+
+class TokenBucket:
+    """
+    Request pacing for one provider. Starts permissive and adapts to the
+    rate-limit headers the provider sends back with every response.
+    """
+    def __init__(self, rate=5.0, capacity=5.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, cancel=None):
+        """Blocks until a request may be sent; raises RequestCancelled once cancel is set."""
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled("request cancelled")
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate if self.rate else 1.0)
+            wait = min(max(wait, 0.01), 5.0)
+            if cancel is not None:
+                cancel.wait(wait)
+            else:
+                time.sleep(wait)
+
+    def block_for(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        """Applies OpenAI x-ratelimit-* or Anthropic anthropic-ratelimit-* request headers."""
+        if not headers:
+            return
+        limit = headers.get("x-ratelimit-limit-requests") or headers.get("anthropic-ratelimit-requests-limit")
+        remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("anthropic-ratelimit-requests-remaining")
+        reset = _parse_reset(headers.get("x-ratelimit-reset-requests") or headers.get("anthropic-ratelimit-requests-reset"))
+        with self.lock:
+            if limit and limit.isdigit() and int(limit) > 0:
+                # Provider request limits are per minute
+                self.capacity = max(1.0, min(float(limit), 10.0))
+                self.rate = int(limit) / 60.0
+            if remaining and remaining.isdigit():
+                self.tokens = min(self.tokens, float(remaining))
+                if int(remaining) == 0 and reset:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + reset)
+
+class CircuitBreaker:
+    """
+    closed -> open after repeated failures -> half_open after a cool-down ->
+    closed on success. In half_open a single probe call goes through; every
+    other caller is rejected until the probe reports.
+    """
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state, self.probing = "half_open", False
+            if self.state == "half_open":
+                if self.probing:
+                    return False
+                self.probing = True
+            return self.state != "open"
+
+    def end_probe(self):
+        """Lets the next caller probe when the probe ended without a verdict (cancelled, bad request)."""
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.state, self.failures, self.opened_at, self.probing = "closed", 0, None, False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+_limiters = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def limiter_for(provider):
+    with _registry_lock:
+        return _limiters.setdefault(provider, TokenBucket())
+
+def breaker_for(provider):
+    with _registry_lock:
+        return _breakers.setdefault(provider, CircuitBreaker())
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    return max(delay, retry_after or 0)
+
+def call(provider, attempt_fn, max_attempts=MAX_ATTEMPTS, cancel=None):
+    """
+    Runs attempt_fn() under the provider's limiter and breaker, retrying
+    RetryableError with jittered exponential backoff. Other errors (bad key,
+    bad request) are raised at once and do not count against the provider.
+    cancel (a threading.Event) is checked before every attempt and cuts the
+    backoff and any Retry-After pause short: RequestCancelled is raised
+    instead of sending again.
+    """
+    breaker = breaker_for(provider)
+    limiter = limiter_for(provider)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{provider} is failing, circuit open (retry in {breaker.reset_timeout:.0f}s)")
+    # The caller that moved the breaker to half_open is its single probe
+    probe = breaker.state == "half_open"
+    try:
+        for attempt in range(max_attempts):
+            limiter.acquire(cancel)
+            try:
+                result = attempt_fn()
+            except RetryableError as e:
+                if e.retry_after:
+                    limiter.block_for(e.retry_after)
+                if attempt == max_attempts - 1:
+                    breaker.record_failure()
+                    save_provider_status()
+                    raise
+                delay = backoff_delay(attempt, e.retry_after)
+                print(f"\n🔁 {provider}: {e} - retrying in {delay:.1f}s ({attempt + 2}/{max_attempts})")
+                if cancel is not None:
+                    if cancel.wait(delay):
+                        raise RequestCancelled("request cancelled")
+                else:
+                    time.sleep(delay)
+                continue
+            recovered = breaker.state != "closed"
+            breaker.record_success()
+            if recovered:
+                save_provider_status()
+            return result
+    finally:
+        if probe:
+            breaker.end_probe()
+
+def get_provider_status():
+    """Live limiter/breaker state for every provider used in this process."""
+    status = {}
+    for provider in set(_limiters) | set(_breakers):
+        breaker, limiter = breaker_for(provider), limiter_for(provider)
+        status[provider] = {
+            "circuit": breaker.state, "failures": breaker.failures,
+            "tokens": round(limiter.tokens, 2), "rate_per_s": round(limiter.rate, 3),
+            "blocked_for_s": round(max(0.0, limiter.blocked_until - time.monotonic()), 1),
+        }
+    return status
+
+def save_provider_status():
+    """Persists the status snapshot so other processes (System Health) can show it."""
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        with open(STATUS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"updated": time.time(), "providers": get_provider_status()}, f, indent=2)
+    except OSError:
+        pass
+
+def load_provider_status():
+    """Last persisted provider status, or None."""
+    try:
+        with open(STATUS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import math
+import functools
+
+STATE_DIR = ".odinos"
+INDEX_FILE = os.path.join(STATE_DIR, "retrieval_index.json")
+INDEX_VERSION = 1
+
+SOURCE_EXTENSIONS = (".py", ".json")
+SKIP_DIRS = {"__pycache__", "backups", "temp_exports", "temp_imports"}
+# config.json holds the API keys, it must never end up in a prompt
+SKIP_FILES = {"config.json"}
+
+CHUNK_LINES = 40
+DEFAULT_OPTIONS = {"top_k": 8, "token_budget": 4000, "outline_budget": 8000}
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOPWORDS = {
+    "the", "and", "for", "not", "with", "this", "that", "from", "import", "def", "return",
+    "self", "none", "true", "false", "if", "else", "elif", "in", "is", "of", "to", "or",
+    "as", "it", "be", "a", "an", "on", "try", "except", "print", "f",
+}
+
+def context_options(settings):
+    """Merges the config.json "context" section over the defaults."""
+    options = dict(DEFAULT_OPTIONS)
+    options.update((settings or {}).get("context", {}))
+    return options
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for code)."""
+    return len(text) // 4 + 1
+
+def tokenize(text):
+    """Lowercased identifier terms; snake_case and camelCase names also yield their parts."""
+    terms = []
+    for word in re.findall(r"[A-Za-z_][A-Za-z0-9_]*", text):
+        parts = [p for p in re.split(r"_|(?<=[a-z0-9])(?=[A-Z])", word) if p]
+        if len(parts) > 1:
+            terms.append(word.lower())
+        terms.extend(p.lower() for p in parts)
+    return [t for t in terms if len(t) > 1 and t not in STOPWORDS]
+
+def iter_source_files(root=".", extensions=SOURCE_EXTENSIONS):
+    """Yields project source paths, skipping hidden folders, caches and backups."""
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS)
+        for name in sorted(files):
+            if name.endswith(extensions) and name not in SKIP_FILES:
+                yield os.path.join(folder, name)
+
+def chunk_lines(lines):
+    """Splits a file into (start, end) line ranges, preferring def/class boundaries."""
+    chunks, start = [], 0
+    for i, line in enumerate(lines):
+        size = i - start
+        stripped = line.lstrip()
+        boundary = (len(line) - len(stripped) <= 4 and
+                    stripped.startswith(("def ", "class ", "async def ", "@")))
+        if size >= CHUNK_LINES * 2 or (size >= CHUNK_LINES // 2 and boundary):
+            chunks.append((start, i))
+            start = i
+    if start < len(lines):
+        chunks.append((start, len(lines)))
+    return chunks
+
+def _read_lines(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def _index_file(path):
+    lines = _read_lines(path)
+    if lines is None:
+        return []
+    chunks = []
+    for start, end in chunk_lines(lines):
+        terms = tokenize(f"{path}\n" + "\n".join(lines[start:end]))
+        if not terms:
+            continue
+        tf = {}
+        for term in terms:
+            tf[term] = tf.get(term, 0) + 1
+        chunks.append({"start": start, "end": end, "length": len(terms), "tf": tf})
+    return chunks
+
+class RetrievalIndex:
+    """
+    Chunk-level BM25 index over the project source, persisted in .odinos and
+    refreshed incrementally: only files whose mtime or size changed are re-read.
+    """
+    def __init__(self, path=INDEX_FILE, root="."):
+        self.path = path
+        self.root = root
+        self.files = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data.get("files", {})
+        except Exception:
+            self.files = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "files": self.files}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def refresh(self):
+        """Re-indexes changed files and drops deleted ones. Returns the number updated."""
+        seen, updated = set(), 0
+        for path in iter_source_files(self.root):
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self.files.get(path)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                continue
+            self.files[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "chunks": _index_file(path)}
+            updated += 1
+        removed = [p for p in self.files if p not in seen]
+        for path in removed:
+            del self.files[path]
+        if updated or removed:
+            self._save()
+        return updated + len(removed)
+
+    def chunks(self, exclude=()):
+        return [(path, chunk) for path, entry in self.files.items() if path not in exclude
+                for chunk in entry["chunks"]]
+
+    def search(self, query, top_k=8, exclude=()):
+        """Returns [(score, path, chunk)] for the best matching chunks, best first."""
+        terms = sorted(set(tokenize(query)))
+        chunks = self.chunks(exclude)
+        if not terms or not chunks:
+            return []
+        scores = bm25_scores([c["tf"] for _, c in chunks], [c["length"] for _, c in chunks], terms)
+        ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+        return [(float(scores[i]), *chunks[i]) for i in ranked[:top_k] if scores[i] > 0]
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """NumPy, imported on the first search so importing this module stays cheap."""
+    try:
+        import numpy
+        return numpy
+    except ImportError:  # Pure-Python scoring fallback (pip install numpy for speed)
+        return None
+
+def bm25_scores(tfs, lengths, terms):
+    """BM25 score of every chunk for the query terms."""
+    n = len(tfs)
+    np = _numpy()
+    if np is not None:
+        tf = np.array([[c.get(t, 0) for t in terms] for c in tfs], dtype=np.float64)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        lens = np.asarray(lengths, dtype=np.float64)
+        norm = K1 * (1 - B + B * lens / max(lens.mean(), 1.0))
+        return (idf * tf * (K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+    avg = max(sum(lengths) / n, 1.0)
+    idf = {}
+    for t in terms:
+        df = sum(1 for c in tfs if t in c)
+        idf[t] = math.log1p((n - df + 0.5) / (df + 0.5))
+    scores = []
+    for c, length in zip(tfs, lengths):
+        norm = K1 * (1 - B + B * length / avg)
+        scores.append(sum(idf[t] * c[t] * (K1 + 1) / (c[t] + norm) for t in terms if t in c))
+    return scores
+
+def build_context(query, token_budget=None, top_k=None, exclude=(), settings=None):
+    """
+    Renders the top-k source chunks relevant to the query, stopping at the
+    token budget, as "FILE: path (lines a-b)" sections for a system prompt.
+    """
+    options = context_options(settings)
+    token_budget = token_budget or options["token_budget"]
+    top_k = top_k or options["top_k"]
+
+    index = RetrievalIndex()
+    index.refresh()
+    exclude = {os.path.join(".", os.path.relpath(p)) for p in exclude}
+
+    sections, used, file_lines = [], 0, {}
+    for _, path, chunk in index.search(query, top_k, exclude):
+        if path not in file_lines:
+            file_lines[path] = _read_lines(path) or []
+        body = "\n".join(file_lines[path][chunk["start"]:chunk["end"]])
+        section = f"{'-'*48}\nFILE: {path} (lines {chunk['start'] + 1}-{chunk['end']})\n{'-'*48}\n{body}\n"
+        cost = estimate_tokens(section)
+        if used + cost > token_budget:
+            continue
+        sections.append(section)
+        used += cost
+
+    total = sum(len(e["chunks"]) for e in index.files.values())
+    print(f"📚 Context: {len(sections)} of {total} chunks, ~{used} tokens (budget {token_budget})")
+    return "\n".join(sections)
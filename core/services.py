@@ -0,0 +1,27 @@
+import sys
+import time
+import socket
+from core import daemon
+
+def is_server_active(port=8080):
+    """Check if the local server is running on the given port (8080 by default)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex(('localhost', port)) == 0
+
+def start_static_server(port=8080):
+    """
+    Starts the local preview server on the given port.
+    Hosted by the resident daemon when one is running, otherwise spawned
+    as a background 'python -m http.server' process like before.
+    """
+    if daemon.request_service("static", port=port):
+        return True
+    try:
+        import subprocess
+        subprocess.Popen([sys.executable, "-m", "http.server", str(port)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(1)
+        return True
+    except Exception as e:
+        print(f"⚠️ Failed to start server: {e}")
+        return False
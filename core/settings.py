@@ -0,0 +1,113 @@
+import os
+import copy
+import json
+import tempfile
+import threading
+
+# Settings service: config.json parsed once, reloaded only when it changes
+CONFIG_FILE = "config.json"
+
+DEFAULTS = {
+    "active_provider": "openai",
+    "api_keys": {"openai": "", "anthropic": ""},
+    "models": {"openai": "gpt-4o-mini", "anthropic": "claude-3-5-sonnet", "local": "models/qwen2.5-1.5b.gguf"},
+    "local": {"threads": 4, "n_ctx": 4096, "max_tokens": 2048, "prompt_cache_mb": 256},
+    "context": {"top_k": 8, "token_budget": 4000, "outline_budget": 8000},
+    "preferences": {"backup_before_evolve": True, "stream_output": False, "response_cache": False, "failover": False,
+                    "race": False, "speculate": False, "speculate_budget_tokens": 20000}
+}
+
+class Settings:
+    """
+    Cached view of config.json. The file is re-parsed only when its mtime
+    (or size) changes; saves are atomic and notify subscribers.
+    """
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self._data = None
+        self._signature = None
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return os.path.abspath(self.path), st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Re-parses the file if it changed since the last read. Returns True on reload."""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+        data = None
+        if signature is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Error reading config: {e}")
+                return False
+        self._data, self._signature = data, signature
+        return True
+
+    def exists(self):
+        return self._stat_signature() is not None
+
+    def load(self):
+        """Returns a copy of the current settings, or None if config.json is missing."""
+        with self._lock:
+            if self._refresh():
+                self._notify()
+            return copy.deepcopy(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if self._refresh():
+                self._notify()
+            return copy.deepcopy((self._data or {}).get(key, default))
+
+    def pref(self, name, default=None):
+        """Shortcut for a value inside the "preferences" section (falls back to DEFAULTS)."""
+        if default is None:
+            default = DEFAULTS["preferences"].get(name)
+        return (self.get("preferences") or {}).get(name, default)
+
+    def save(self, data):
+        """Atomically writes config.json (temp file + rename) and notifies subscribers."""
+        with self._lock:
+            folder = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(prefix=".config.", suffix=".tmp", dir=folder)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._data = copy.deepcopy(data)
+            self._signature = self._stat_signature()
+            self._notify()
+
+    def subscribe(self, callback):
+        """Calls callback(settings) on every reload or save. Returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def _notify(self):
+        for callback in list(self._subscribers):
+            try:
+                callback(copy.deepcopy(self._data))
+            except Exception as e:
+                print(f"⚠️ Settings subscriber failed: {e}")
+
+_settings = Settings()
+
+def get_settings():
+    """Returns the process-wide Settings service."""
+    return _settings
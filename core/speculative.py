@@ -0,0 +1,44 @@
+import io
+import sys
+import threading
+from core import console
+
+class Speculation:
+    """
+    Runs fn(cancel_event) in a background thread ahead of time. What it
+    prints is held back and replayed only when the result is used (live
+    progress on stderr is dropped); cancel() sets the event so fn can stop
+    early, and the result is then discarded.
+    """
+    def __init__(self, fn):
+        # Swap the streams here, before the user gets the input() prompt, and never back
+        console.install()
+        self.cancel_event = threading.Event()
+        self._done = threading.Event()
+        self._output = io.StringIO()
+        self._result = None
+        self._error = None
+        threading.Thread(target=self._run, args=(fn,), daemon=True).start()
+
+    def _run(self, fn):
+        try:
+            with console.captured(self._output, io.StringIO()):
+                self._result = fn(self.cancel_event)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self):
+        """Waits for fn, replays what it printed and returns its value (or raises its error)."""
+        self._done.wait()
+        sys.stdout.write(self._output.getvalue())
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        self.cancel_event.set()
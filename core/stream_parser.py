@@ -0,0 +1,119 @@
+import os
+
+CODE_MARKER = "---CODIGO---"
+SUGGESTION_MARKER = "---SUGERENCIA---"
+FENCES = ("```python", "```html", "```")
+
+class MarkerStreamParser:
+    """
+    Incremental counterpart of parse_ai_response. feed() it text deltas:
+    code after ---CODIGO--- is passed to on_code as whole lines (fences and
+    leading/trailing blank lines dropped), text after ---SUGERENCIA--- goes
+    to on_suggestion as it arrives. Markers may be split across deltas.
+    """
+    def __init__(self, on_code, on_suggestion):
+        self.on_code = on_code
+        self.on_suggestion = on_suggestion
+        self.state = "preamble"
+        self._pending = ""
+        self._line = ""
+        self._blank_lines = 0
+        self._code_started = False
+        self._suggestion_started = False
+
+    def feed(self, delta):
+        self._pending += delta
+        while True:
+            marker = {"preamble": CODE_MARKER, "code": SUGGESTION_MARKER}.get(self.state)
+            if marker is None:
+                self._emit(self._pending)
+                self._pending = ""
+                return
+            idx = self._pending.find(marker)
+            if idx < 0:
+                # Hold back what could be the start of a marker split across deltas
+                safe = len(self._pending) - (len(marker) - 1)
+                if safe > 0:
+                    self._emit(self._pending[:safe])
+                    self._pending = self._pending[safe:]
+                return
+            self._emit(self._pending[:idx])
+            self._pending = self._pending[idx + len(marker):]
+            if self.state == "code":
+                self._flush_line()
+            self.state = "code" if self.state == "preamble" else "suggestion"
+
+    def finish(self):
+        """Flushes what is still buffered once the stream has ended."""
+        self._emit(self._pending)
+        self._pending = ""
+        if self.state == "code":
+            self._flush_line()
+
+    def _emit(self, text):
+        if not text or self.state == "preamble":
+            return
+        if self.state == "suggestion":
+            if not self._suggestion_started:
+                text = text.lstrip()
+                self._suggestion_started = bool(text)
+            if text:
+                self.on_suggestion(text)
+            return
+        self._line += text
+        while "\n" in self._line:
+            line, self._line = self._line.split("\n", 1)
+            self._code_line(line)
+
+    def _flush_line(self):
+        line, self._line = self._line, ""
+        self._code_line(line.rstrip())
+
+    def _code_line(self, line):
+        cleaned = line
+        for fence in FENCES:
+            cleaned = cleaned.replace(fence, "")
+        if not cleaned.strip():
+            # Blank lines are only written once more code follows them
+            if self._code_started:
+                self._blank_lines += 1
+            return
+        if not self._code_started:
+            self._code_started = True
+            self.on_code(cleaned.lstrip())
+        else:
+            self.on_code("\n" * (self._blank_lines + 1) + cleaned)
+        self._blank_lines = 0
+
+class ProgressiveFile:
+    """
+    Writes to a hidden temp file next to path, flushing as it goes so a
+    preview can load it, and renames it over path on commit().
+    """
+    def __init__(self, path):
+        folder, name = os.path.split(path)
+        stem, ext = os.path.splitext(name)
+        self.path = path
+        # Keep the extension so the static server sends the right content type
+        self.temp_path = os.path.join(folder, f".{stem}.partial{ext}")
+        os.makedirs(folder or ".", exist_ok=True)
+        self._file = open(self.temp_path, "w", encoding="utf-8")
+        self.size = 0
+        self.lines = 0
+
+    def write(self, text):
+        self._file.write(text)
+        self._file.flush()
+        self.size += len(text)
+        self.lines += text.count("\n")
+
+    def commit(self):
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
@@ -1,84 +1,68 @@
 import os
-import importlib.util
 import sys
+from core import registry, daemon, executor
+
+# Categorization mapping: names must match the 'label' in each plugin's config
+CATEGORIES = {
+    "🚀 CREATION & AI": [
+        "App Creator & Editor",
+        "Auto-Evolve (create functionality)",
+        "Agent Mode (Total control)"
+    ],
+    "🗂️ APPs MANAGEMENT": [
+        "APPs Manager",
+        "Visual Launcher",
+        "Delete Apps",
+        "Smart Import-Export Hub"
+    ],
+    "🧠 SYSTEM & SECURITY": [            
+        "Time Machine (Restore)",
+        "Uninstaller Functionality"            
+    ],
+    "⚙️ SETTINGS": [
+        "Global Settings Hub",                      
+        "System Health"
+    ],
+    "ℹ️ HELP": [
+        "Help"
+    ]
+}
 
 def load_plugins():
     """
-    Scans the 'plugins' directory and dynamically loads modules 
-    containing a 'config' dict and a 'run' function.
+    Returns the plugin entries from the on-disk registry.
+    New or changed plugins are read statically; modules are imported on selection.
     """
-    plugin_dir = "plugins"
-    if not os.path.exists(plugin_dir):
-        os.makedirs(plugin_dir)
-
-    loaded_plugins = []
-    
-    for item in os.listdir(plugin_dir):
-        # Skip hidden files, __init__, and cache
-        if item == "__init__.py" or item.startswith(".") or item == "__pycache__":
-            continue
-            
-        item_path = os.path.join(plugin_dir, item)
-        module_name = ""
-        entry_point = ""
-
-        # Check for single-file plugins (.py)
-        if item.endswith(".py"):
-            module_name = item[:-3]
-            entry_point = item_path
-        # Check for folder-based plugins (folder/main.py)
-        elif os.path.isdir(item_path):
-            main_file = os.path.join(item_path, "main.py")
-            if os.path.exists(main_file):
-                module_name = item 
-                entry_point = main_file
-            else:
-                continue
+    return registry.refresh(CATEGORIES)
 
-        if entry_point:
-            try:
-                spec = importlib.util.spec_from_file_location(module_name, entry_point)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Only load if valid plugin structure is present
-                if hasattr(module, 'config') and hasattr(module, 'run'):
-                    loaded_plugins.append(module)
-            except Exception as e:
-                print(f"⚠️ Error loading {item}: {e}")
+def profile_startup():
+    """
+    Imports heavy dependencies and every plugin under the profiler, then
+    writes the ranked report and Chrome trace to the .odinos folder.
+    """
+    from core import profiler
+    from core.discovery import iter_entry_points
+    profile = profiler.profile_startup(list(iter_entry_points()))
+    print(profiler.save_profile(profile))
+    print(f"\n📄 Report: {profiler.REPORT_FILE}")
+    print(f"📈 Chrome trace: {profiler.TRACE_FILE} (open in chrome://tracing or ui.perfetto.dev)")
 
-    # Default alphabetical sort by label for the 'Others' category
-    return sorted(loaded_plugins, key=lambda x: x.config.get("label", "").lower())
+def warm_up():
+    """
+    Imports core services and every plugin once, so daemon sessions start warm.
+    """
+    import core.ai, core.apps
+    for entry in load_plugins():
+        try:
+            registry.load_module(entry)
+        except Exception as e:
+            print(f"⚠️ Error warming {entry['module_name']}: {e}")
 
 def main_menu():
     """
     Displays the categorized main menu and handles user selection.
     """
-    # Categorization mapping: names must match the 'label' in each plugin's config
-    CATEGORIES = {
-        "🚀 CREATION & AI": [
-            "App Creator & Editor",
-            "Auto-Evolve (create functionality)",
-            "Agent Mode (Total control)"
-        ],
-        "🗂️ APPs MANAGEMENT": [
-            "APPs Manager",
-            "Visual Launcher",
-            "Delete Apps",
-            "Smart Import-Export Hub"
-        ],
-        "🧠 SYSTEM & SECURITY": [            
-            "Time Machine (Restore)",
-            "Uninstaller Functionality"            
-        ],
-        "⚙️ SETTINGS": [
-            "Global Settings Hub",                      
-            "System Health"
-        ],
-        "ℹ️ HELP": [
-            "Help"
-        ]
-    }
+    last_run = ""
 
     while True:
         os.system('clear')
@@ -87,6 +71,8 @@ def main_menu():
         print("==========================================")
         print("      🚀 ACORNIX          ")
         print("==========================================")
+        if last_run:
+            print(f" {last_run}")
         
         mapping = {}
         current_idx = 1
@@ -97,16 +83,16 @@ def main_menu():
             plugins_in_cat = []
             
             for label_name in desired_order:
-                # Find the loaded plugin matching the category label
-                found = next((p for p in plugins if p.config.get('label') == label_name), None)
+                # Find the registered plugin matching the category label
+                found = next((p for p in plugins if p["category"] == cat_name and p["config"].get('label') == label_name), None)
                 if found:
                     plugins_in_cat.append(found)
 
             if plugins_in_cat:
                 print(f"\n {cat_name}")
                 for p in plugins_in_cat:
-                    icon = p.config.get('icon', '🧩')
-                    label = p.config.get('label', 'Unknown')
+                    icon = p["config"].get('icon', '🧩')
+                    label = p["config"].get('label', 'Unknown')
                     print(f"   {current_idx}) {icon} {label}")
                     
                     mapping[current_idx] = p
@@ -114,13 +100,13 @@ def main_menu():
                     current_idx += 1
 
         # 2. Display Uncategorized / New Plugins
-        others = [p for p in plugins if p.config.get('label') not in displayed_labels]
+        others = [p for p in plugins if p["config"].get('label') not in displayed_labels]
         
         if others:
             print(f"\n 📂 OTHERS / UTILITIES")
             for p in others:
-                icon = p.config.get('icon', '🧩')
-                label = p.config.get('label', 'Unknown')
+                icon = p["config"].get('icon', '🧩')
+                label = p["config"].get('label', 'Unknown')
                 print(f"   {current_idx}) {icon} {label}")
                 mapping[current_idx] = p
                 current_idx += 1
@@ -139,8 +125,12 @@ def main_menu():
             idx = int(choice)
             if idx in mapping:
                 try:
-                    # Run the selected plugin's main function
-                    mapping[idx].run()
+                    # Import on demand in the menu process, so every run forks warm
+                    module = registry.load_module(mapping[idx])
+                    stats = executor.run_plugin(module)
+                    last_run = executor.format_stats(mapping[idx]["config"].get('label', 'Unknown'), stats)
+                    if stats["code"] not in (0, 130):
+                        input("\nPress Enter to return to main menu...")
                 except Exception as e:
                     print(f"\n❌ Critical Error running plugin: {e}")
                     input("\nPress Enter to return to main menu...")
@@ -150,4 +140,29 @@ def main_menu():
                 time.sleep(1.5)
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    if "--daemon" in sys.argv:
+        daemon.serve(main_menu, warm_up, foreground="--foreground" in sys.argv)
+    elif "--profile-startup" in sys.argv:
+        profile_startup()
+    elif "--bench" in sys.argv:
+        from core import bench
+        bench.main(sys.argv)
+    elif "--check-import-budget" in sys.argv:
+        from core import profiler
+        sys.exit(0 if profiler.check_import_budgets() else 1)
+    elif "--context-snapshot" in sys.argv:
+        from core import context
+        output_file, changed = context.update_context_file()
+        if changed:
+            print(f"📄 {output_file} rebuilt ({changed} changed files)")
+        else:
+            print(f"📄 {output_file} is up to date")
+    elif "--stop-daemon" in sys.argv:
+        daemon.stop()
+    else:
+        # Attach to a resident daemon when available, otherwise run in-process
+        code = daemon.attach()
+        if code is None:
+            main_menu()
+        else:
+            sys.exit(code)
\ No newline at end of file
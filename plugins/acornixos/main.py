@@ -12,6 +12,7 @@ import builtins
 import importlib.util
 import subprocess
 from urllib.parse import quote, unquote, urlparse
+from core.discovery import discover_plugins
 
 # Plugin Configuration
 config = {"label": "acornixOS", "icon": "🍏"}
@@ -151,33 +152,18 @@ def _list_apps(base_folder):
     return entries
 
 def _list_plugins():
-    plugin_dir = "plugins"
     entries = []
-    if not os.path.exists(plugin_dir): return entries
+    if not os.path.exists("plugins"): return entries
         
-    for item in os.listdir(plugin_dir):
-        if item in ("__init__.py", "__pycache__") or item.startswith("."): continue
-        item_path = os.path.join(plugin_dir, item)
-        module_name, entry_point = "", ""
-        
-        if item.endswith(".py"): module_name, entry_point = item[:-3], item_path
-        elif os.path.isdir(item_path):
-            main_file = os.path.join(item_path, "main.py")
-            if os.path.exists(main_file): module_name, entry_point = item, main_file
-        
-        if module_name == "acornixOS": continue
-        if entry_point:
-            try:
-                spec = importlib.util.spec_from_file_location(module_name, entry_point)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                if hasattr(module, 'config') and hasattr(module, 'run'):
-                    entries.append({
-                        "name": module.config.get("label", module_name),
-                        "type": "plugin", "icon": module.config.get("icon", "🧩"),
-                        "entry_point": entry_point, "module_name": module_name, "url": ""
-                    })
-            except: pass
+    # Static discovery: plugin configs are read without executing plugin code
+    for info in discover_plugins():
+        module_name, entry_point = info["module_name"], info["entry_point"]
+        if module_name == "acornixOS" or "error" in info: continue
+        entries.append({
+            "name": info["config"].get("label", module_name),
+            "type": "plugin", "icon": info["config"].get("icon", "🧩"),
+            "entry_point": entry_point, "module_name": module_name, "url": ""
+        })
     return sorted(entries, key=lambda x: x["name"].lower())
 
 # --- OS HTML GENERATOR ---
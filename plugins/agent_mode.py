@@ -1,5 +1,5 @@
 import os
-from core.utils import ask_ai, process_and_execute
+from core.utils import ask_ai, process_and_execute, warm_provider
 
 # Plugin Configuration
 config = {
@@ -12,6 +12,8 @@ def run():
     Executes the autonomous agent mode. 
     The agent can perform system tasks using Python scripts.
     """
+    # Warm the provider connection while the user is still typing
+    warm_provider()
     os.system('clear')
     print("=== 🧠 AGENT MODE (TOTAL CONTROL) ===")
     print("Type your command or task for the system (e.g., 'Clean temp files', 'Organize my apps')")
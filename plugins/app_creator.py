@@ -1,24 +1,26 @@
 import os
 import shutil
 import datetime
-import json
-from core.utils import ask_ai, process_and_execute
+from core.utils import (ask_ai_batch, process_and_execute, parse_ai_response,
+                        save_project, improve_code, generate_app, warm_provider, get_settings)
 
 # Plugin Configuration
 config = {"label": "App Creator & Editor", "icon": "🏗️"}
 
+# Optimized prompt for initial creation
+CREATE_SYS_PROMPT = (
+    "You are an Expert Web Developer Assistant. "
+    "Strictly follow this format: ---CODIGO--- and ---SUGERENCIA---. "
+    "Use HTML/JS/CSS to build high-quality Single Page Applications (SPA). "
+    "All UI text and comments MUST be in English."
+)
+
 # --- SAFETY AND UTILITY TOOLS ---
 def perform_backup(app_folder_path):
     """Creates a security ZIP backup of the app before modification."""
-    # 1. Check user preferences in config.json
-    if os.path.exists("config.json"):
-        try:
-            with open("config.json", "r") as f:
-                settings = json.load(f)
-                if not settings.get("preferences", {}).get("backup_before_evolve", True):
-                    return 
-        except: 
-            pass
+    # 1. Check user preferences (cached settings service)
+    if not get_settings().pref("backup_before_evolve", True):
+        return
 
     # 2. Prepare backup directory
     backup_dir = "backups"
@@ -36,22 +38,70 @@ def perform_backup(app_folder_path):
     except Exception as e:
         print(f"⚠️  Failed to create backup: {e}")
 
-def clean_html_code(text):
-    """Cleans AI response to extract only the raw HTML/JS/CSS code."""
-    if "```html" in text:
-        text = text.split("```html")[1].split("```")[0]
-    elif "```" in text:
-        text = text.split("```")[1].split("```")[0]
-    return text.strip()
+def read_idea_list():
+    """
+    Reads 'name: idea' lines typed by the user (blank line to finish) or from
+    a .txt file path. Returns a list of (name, idea).
+    """
+    print("\nEnter one app per line as 'name: idea' (empty line to finish),")
+    print("or type the path of a .txt file with the same format.")
+    lines = []
+    while True:
+        line = input("> ").strip()
+        if not line:
+            break
+        if not lines and line.endswith(".txt") and os.path.isfile(line):
+            with open(line, "r", encoding="utf-8") as f:
+                lines = [l.strip() for l in f if l.strip()]
+            break
+        lines.append(line)
+
+    ideas = []
+    for line in lines:
+        name, sep, idea = line.partition(":")
+        if sep and name.strip() and idea.strip():
+            ideas.append((name.strip(), idea.strip()))
+        else:
+            print(f"⚠️ Skipped (expected 'name: idea'): {line}")
+    return ideas
+
+def create_from_list():
+    """Generates several apps concurrently from a list of ideas."""
+    ideas = read_idea_list()
+    if not ideas:
+        return
+    workers = input("Parallel requests (default 3): ").strip()
+    workers = int(workers) if workers.isdigit() and int(workers) > 0 else 3
+
+    print(f"\n🧠 Programming {len(ideas)} apps ({workers} at a time)...")
+    results = ask_ai_batch([idea for _, idea in ideas], CREATE_SYS_PROMPT, max_concurrency=workers)
+
+    print("\n--- BATCH RESULTS ---")
+    failed = []
+    for (name, _), result in zip(ideas, results):
+        code_block, _ = parse_ai_response(result["text"])
+        if result["error"]:
+            failed.append(f"{name}: {result['error']}")
+        elif code_block is None:
+            failed.append(f"{name}: no ---CODIGO--- block in the answer")
+        else:
+            print(f"✅ {name}: {save_project(code_block, name)} ({result['latency']:.1f}s)")
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(ideas)} apps failed:")
+        for line in failed:
+            print(f"   - {line}")
 
 # --- MAIN LOGIC ---
 def run():
     """Main loop for creating and editing web applications."""
+    # Warm the provider connection while the user is still typing
+    warm_provider()
     while True:
         os.system('clear')
         print("=== 🏗️ WEB APP CREATOR & EDITOR ===")
         print("1) ✨ Create New Web App")
         print("2) 🛠️ Improve/Fix Existing App")
+        print("3) 📋 Create from List (batch)")
         print("0) 🔙 Back")
 
         opt = input("\nSelect an option: ").strip()
@@ -67,19 +117,12 @@ def run():
             
             idea = input(f"🎨 What should I build for '{name}'?: ")
             
-            # Optimized prompt for initial creation
-            sys_prompt = (
-                "You are an Expert Web Developer Assistant. "
-                "Strictly follow this format: ---CODIGO--- and ---SUGERENCIA---. "
-                "Use HTML/JS/CSS to build high-quality Single Page Applications (SPA). "
-                "All UI text and comments MUST be in English."
-            )
-            
             print(f"\n🧠 Programming '{name}' from scratch...")
-            res = ask_ai(idea, sys_prompt)
+            # index.html is written while the answer streams in
+            res = generate_app(idea, CREATE_SYS_PROMPT, name)
             
             # process_and_execute handles file generation and server checks
-            process_and_execute(res, name)
+            process_and_execute(res, name, suggestion_shown=True)
             input("\nPress Enter to continue...")
 
         # --- MODE 2: IMPROVE/EDIT ---
@@ -132,22 +175,18 @@ def run():
                 if req == "0": 
                     continue
 
-                sys_prompt = (
-                    "YOU ARE A SENIOR WEB DEVELOPER. OUTPUT ONLY RAW HTML/JS/CSS CODE. "
-                    "NO MARKDOWN. NO EXPLANATIONS. ALL TEXT MUST BE IN ENGLISH."
-                )
-                prompt = (
-                    f"Existing code:\n\n{old_code}\n\n"
-                    f"TASK: {req}\n\n"
-                    "Return the COMPLETE updated index.html code."
-                )
-
                 print(f"\n🧠 Applying changes to {app_name}...")
-                new_code = ask_ai(prompt, sys_prompt)
+                new_code, _ = improve_code(old_code, req)
 
-                if new_code:
-                    clean_code = clean_html_code(new_code)
+                if new_code is not None:
                     with open(target_file, "w", encoding="utf-8") as f:
-                        f.write(clean_code)
+                        f.write(new_code)
                     print(f"\n✅ App successfully updated: {target_file}")
-                    input("\nPress Enter to continue...")
\ No newline at end of file
+                else:
+                    print("\n⚠️ No valid code came back, the app was not changed.")
+                input("\nPress Enter to continue...")
+
+        # --- MODE 3: BATCH CREATE ---
+        elif opt == "3":
+            create_from_list()
+            input("\nPress Enter to continue...")
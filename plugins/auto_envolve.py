@@ -1,8 +1,9 @@
 import os
 import shutil
 import datetime
-import json
-from core.utils import ask_ai
+from core.utils import ask_ai, warm_provider, get_settings
+from core.retrieval import build_context
+from core.context import build_outline_context
 
 # Plugin configuration
 config = {
@@ -16,15 +17,9 @@ def perform_backup(plugin_folder_path):
     Compresses the entire plugin folder into a ZIP within /backups.
     Example: backups/calculator_20260211_1430.zip
     """
-    # 1. Check user preference in config.json
-    if os.path.exists("config.json"):
-        try:
-            with open("config.json", "r") as f:
-                settings = json.load(f)
-                if not settings.get("preferences", {}).get("backup_before_evolve", True):
-                    return 
-        except: 
-            pass
+    # 1. Check user preferences (cached settings service)
+    if not get_settings().pref("backup_before_evolve", True):
+        return
 
     # 2. Prepare backup directory
     backup_dir = "backups"
@@ -45,33 +40,6 @@ def perform_backup(plugin_folder_path):
     except Exception as e:
         print(f"⚠️  Failed to create backup ZIP: {e}")
 
-def update_context_file():
-    """Gathers all project source code into a single text file for AI context."""
-    output_file = "totalcode.txt"
-    print(f"🔍 Scanning project context...")
-    
-    extensions = ('.py', '.json')
-    with open(output_file, "w", encoding="utf-8") as out:
-        for root, dirs, files in os.walk("."):
-            # Ignore hidden folders, cache, and system directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ["__pycache__", "backups", "temp_exports", "temp_imports"]]
-            
-            for file in files:
-                if file.endswith(extensions):
-                    path = os.path.join(root, file)
-                    # Avoid reading the context file itself
-                    if path == f"./{output_file}" or path == output_file: 
-                        continue
-                    
-                    out.write(f"{'-'*48}\nFILE: {path}\n{'-'*48}\n")
-                    try:
-                        with open(path, "r", encoding="utf-8") as f:
-                            out.write(f.read())
-                    except: 
-                        continue
-                    out.write("\n\n")
-    return output_file
-
 def clean_ai_code(text):
     """Extracts raw code from AI response, removing markdown and conversational text."""
     if "```python" in text:
@@ -92,6 +60,29 @@ def clean_ai_code(text):
         
     return '\n'.join(clean_lines).strip()
 
+# System prompt template; {context} is filled with the code relevant to the task
+BASE_SYS_PROMPT = """YOU ARE A TERMINAL CODE GENERATOR.
+        CONTEXT: {context}
+        STRICT RULES:
+        1. Output MUST BE 100% RAW PYTHON CODE ONLY.
+        2. NO introductory text, NO markdown blocks.
+        3. CODE MUST START DIRECTLY WITH 'import', 'from' OR 'config ='.
+        4. USE ENGLISH FOR ALL COMMENTS AND VARIABLE NAMES.
+        """
+
+def build_sys_prompt(task, target_file=None):
+    """
+    System prompt with only the project code relevant to the task: matching
+    chunks for new plugins, API outlines of the other modules when improving
+    target_file (which is sent in full with the request).
+    """
+    settings = get_settings().load()
+    if target_file:
+        context = build_outline_context(task, exclude=[target_file], settings=settings)
+    else:
+        context = build_context(task, settings=settings)
+    return BASE_SYS_PROMPT.format(context=context)
+
 def sanitize_folder_name(name):
     """Cleans a string to create a valid folder name."""
     clean = "".join(e for e in name if e.isalnum() or e == " ").lower().replace(" ", "_")
@@ -99,6 +90,8 @@ def sanitize_folder_name(name):
 
 def run():
     """Main plugin execution loop."""
+    # Warm the provider connection while the user is still typing
+    warm_provider()
     while True:
         os.system('clear')
         print("=== 🧬 SYSTEM EVOLUTION (AUTO-EVOLVE) ===")
@@ -110,23 +103,6 @@ def run():
         if mode == "0": 
             break
 
-        # Refresh context file before AI request
-        context_path = update_context_file()
-        try:
-            with open(context_path, "r", encoding="utf-8") as f: 
-                full_context = f.read()
-        except: 
-            full_context = ""
-
-        base_sys_prompt = f"""YOU ARE A TERMINAL CODE GENERATOR.
-        CONTEXT: {full_context}
-        STRICT RULES:
-        1. Output MUST BE 100% RAW PYTHON CODE ONLY.
-        2. NO introductory text, NO markdown blocks.
-        3. CODE MUST START DIRECTLY WITH 'import', 'from' OR 'config ='.
-        4. USE ENGLISH FOR ALL COMMENTS AND VARIABLE NAMES.
-        """
-
         if mode == "1":
             plugin_name = input("\n📝 New Plugin Name (or 0 to cancel): ")
             if plugin_name == "0": 
@@ -139,7 +115,7 @@ def run():
             prompt = f"Create a new plugin named '{plugin_name}' that does: {plugin_task}."
             print(f"\n🧠 Programming {folder_name}/main.py...")
             
-            code = ask_ai(prompt, base_sys_prompt)
+            code = ask_ai(prompt, build_sys_prompt(f"plugin config run {plugin_task}"))
             if code:
                 os.makedirs(plugin_dir, exist_ok=True)
                 save_path = os.path.join(plugin_dir, "main.py")
@@ -186,7 +162,8 @@ def run():
                         continue
                     
                     print(f"\n🧠 Thinking and improving {name}...")
-                    new_code = ask_ai(f"Improve this code:\n{old_code}\nTask: {issue}", base_sys_prompt)
+                    sys_prompt = build_sys_prompt(f"{name} {issue}", target_file=target_file)
+                    new_code = ask_ai(f"Improve this code:\n{old_code}\nTask: {issue}", sys_prompt)
                     
                     if new_code:
                         with open(target_file, "w", encoding="utf-8") as f:
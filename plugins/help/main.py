@@ -179,10 +179,12 @@ HTML_CONTENT = """<!DOCTYPE html>
         
         <div class="card">
           <h3>How the OS learns:</h3>
-          <p>The system reads a file called <code>totalcode.txt</code>. This file acts as the "memory" or "context" for the AI, letting it know exactly how your OS routes, menus, and APIs function.</p>
-          <pre><code># Always run this command if you change core files:
-# It updates the memory for the AI
-cat main.py plugins/*.py > totalcode.txt</code></pre>
+          <p>The system keeps a search index of its own source in <code>.odinos/</code>. For every request it sends the AI only the parts of the code that matter (and short outlines of the other modules), so it knows how your OS routes, menus, and APIs function.</p>
+          <pre><code># Nothing to run by hand: the index follows
+# your changes to core files and plugins
+
+# Whole-project snapshot (totalcode.txt) to paste elsewhere:
+python main.py --context-snapshot</code></pre>
         </div>
         <div class="card">
           <h3>⚠️ Warning</h3>
@@ -1,7 +1,6 @@
 import os
 import subprocess
-import time
-from core.utils import is_server_active
+from core.utils import is_server_active, start_static_server
 
 # Plugin Configuration
 config = {"label": "APPs Manager", "icon": "🗂️"}
@@ -27,9 +26,7 @@ def _list_projects(base_folder):
 def _start_server():
     """Starts a local Python HTTP server on port 8080."""
     print("\n📡 Starting background server (port 8080)...")
-    subprocess.Popen(["python", "-m", "http.server", "8080"],
-                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    time.sleep(1)
+    start_static_server(8080)
 
 def run():
     """Main loop for managing and launching projects."""
@@ -1,34 +1,80 @@
 import os
-import json
+import copy
+from core.utils import get_settings
+from core.settings import DEFAULTS
+from core.gguf import list_models, describe
+from core.fetch import download
 
 # Plugin Configuration
 config = {"label": "Global Settings Hub", "icon": "⚙️"}
-CONFIG_FILE = "config.json"
 
 def load_settings():
-    """Loads settings from config.json or returns defaults if file doesn't exist."""
-    if not os.path.exists(CONFIG_FILE):
-        return {
-            "active_provider": "openai",
-            "api_keys": {"openai": "", "anthropic": ""},
-            "models": {"openai": "gpt-4o-mini", "anthropic": "claude-3-5-sonnet"},
-            "preferences": {"backup_before_evolve": True}
-        }
-    try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f: 
-            return json.load(f)
-    except Exception as e:
-        print(f"⚠️ Error reading config: {e}")
-        return {}
+    """Loads settings from config.json (cached by mtime) or returns defaults if file doesn't exist."""
+    settings = get_settings()
+    if not settings.exists():
+        return copy.deepcopy(DEFAULTS)
+    return settings.load() or {}
 
 def save_settings(data):
-    """Saves the settings dictionary to config.json."""
+    """Saves the settings dictionary to config.json (atomic write)."""
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        get_settings().save(data)
     except Exception as e:
         print(f"❌ Error saving settings: {e}")
 
+def _pick_local_model(current_model):
+    """Offers the models found in models/ (header metadata only) as a pick list."""
+    models = list_models()
+    for i, entry in enumerate(models, 1):
+        print(f"{i}) {os.path.basename(entry['path'])} - {describe(entry)}")
+    if not models:
+        print("🚫 No model files found in 'models/'.")
+    choice = input(f"Model number or GGUF path (current: {current_model}): ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(models):
+        entry = models[int(choice) - 1]
+        if "error" in entry:
+            print(f"⚠️ Selected anyway, but: {entry['error']}")
+        return entry["path"]
+    return choice
+
+def _download_model_menu(settings):
+    """Downloads a model into models/ (resumable, parallel ranges, SHA-256 checked)."""
+    print("\n--- 📥 DOWNLOAD LOCAL MODEL ---")
+    # "model_sources": {"file.gguf": {"url": "...", "sha256": "..."}} in config.json
+    sources = settings.get('model_sources', {})
+    names = list(sources.keys())
+    for i, name in enumerate(names, 1):
+        print(f"{i}) {name}")
+    print(f"{len(names) + 1}) Enter URL manually")
+    print("0) Cancel")
+
+    choice = input("\nSelect a model: ").strip()
+    if not choice.isdigit() or choice == "0":
+        return
+    idx = int(choice)
+    if 1 <= idx <= len(names):
+        name = names[idx - 1]
+        url, sha256 = sources[name].get("url"), sources[name].get("sha256")
+    elif idx == len(names) + 1:
+        url = input("Model URL: ").strip()
+        name = input("Save as (file name in models/): ").strip() or os.path.basename(url.split("?")[0])
+        sha256 = input("Expected SHA-256 (optional): ").strip() or None
+    else:
+        print("❌ Invalid selection.")
+        return
+    if not url:
+        print("❌ No URL configured for this model.")
+        return
+
+    target = os.path.join("models", name)
+    try:
+        digest = download(url, target, sha256)
+        print(f"✅ Saved {target} (sha256 {digest[:16]}...)")
+    except KeyboardInterrupt:
+        print("\n⏸️ Paused. Select the same model again to resume.")
+    except Exception as e:
+        print(f"❌ Download failed: {e}")
+
 def run():
     """Main loop for the Settings Hub."""
     while True:
@@ -41,6 +87,9 @@ def run():
 
         active_prov = settings.get('active_provider', 'openai')
         provider_list = list(settings.get('api_keys', {}).keys())
+        # The local GGUF provider needs no API key, so it is not listed in api_keys
+        if "local" not in provider_list:
+            provider_list.append("local")
         
         print(f"=== ⚙️ GLOBAL SETTINGS HUB ===")
         print(f"ACTIVE: {active_prov.upper()} | MODEL: {settings['models'].get(active_prov)}")
@@ -48,6 +97,7 @@ def run():
         print("1) 🚀 Guided Configuration (Provider -> Model -> Key)")
         print("2) 🧠 Change Active Provider")
         print("3) 🛠️ System Preferences")
+        print("4) 📥 Download Local Model")
         print("\n0) 🔙 Back")
         
         option = input("\nSelect an option: ").strip()
@@ -68,16 +118,26 @@ def run():
                 provider = provider_list[int(p_idx)-1]
                 
                 print(f"\n--- STEP 2: Set Model for {provider.upper()} ---")
-                print("Enter manually (e.g., gpt-4o, claude-3-5-sonnet, etc.)")
                 current_model = settings['models'].get(provider, "Not set")
-                new_model = input(f"Model (current: {current_model}): ").strip()
+                if provider == "local":
+                    new_model = _pick_local_model(current_model)
+                else:
+                    print("Enter manually (e.g., gpt-4o, claude-3-5-sonnet, etc.)")
+                    new_model = input(f"Model (current: {current_model}): ").strip()
                 if new_model: 
                     settings['models'][provider] = new_model
                 
-                print(f"\n--- STEP 3: API Key ---")
-                new_key = input(f"Enter API Key for {provider}: ").strip()
-                if new_key: 
-                    settings['api_keys'][provider] = new_key
+                if provider == "local":
+                    print(f"\n--- STEP 3: CPU Threads ---")
+                    local = settings.setdefault('local', {})
+                    threads = input(f"Threads (current: {local.get('threads', 'auto')}): ").strip()
+                    if threads.isdigit() and int(threads) > 0:
+                        local['threads'] = int(threads)
+                else:
+                    print(f"\n--- STEP 3: API Key ---")
+                    new_key = input(f"Enter API Key for {provider}: ").strip()
+                    if new_key: 
+                        settings['api_keys'][provider] = new_key
                 
                 settings['active_provider'] = provider
                 save_settings(settings)
@@ -106,15 +166,52 @@ def run():
         elif option == "3":
             print("\n--- 🛠️ SYSTEM PREFERENCES ---")
             backup_pref = settings.get('preferences', {}).get('backup_before_evolve', True)
+            stream_pref = settings.get('preferences', {}).get('stream_output', False)
+            cache_pref = settings.get('preferences', {}).get('response_cache', False)
             print(f"1) Backup before Evolution: {'YES' if backup_pref else 'NO'}")
+            print(f"2) Stream AI output (live progress): {'YES' if stream_pref else 'NO'}")
+            failover_pref = settings.get('preferences', {}).get('failover', False)
+            print(f"3) Cache identical AI requests locally: {'YES' if cache_pref else 'NO'}")
+            print(f"4) Fail over to the next provider when one is down: {'YES' if failover_pref else 'NO'}")
+            race_pref = settings.get('preferences', {}).get('race', False)
+            print(f"5) Race two providers, keep the fastest answer: {'YES' if race_pref else 'NO'}")
+            speculate_pref = settings.get('preferences', {}).get('speculate', False)
+            print(f"6) Pre-generate suggested improvements while you read: {'YES' if speculate_pref else 'NO'}")
+            budget_pref = settings.get('preferences', {}).get('speculate_budget_tokens',
+                                                              DEFAULTS['preferences']['speculate_budget_tokens'])
+            print(f"7) Pre-generation budget (discarded tokens per session): {budget_pref}")
             print("0) Back")
             
             pref_opt = input("\nSelect preference number to toggle: ")
-            if pref_opt == "1":
+            if pref_opt == "7":
+                new_budget = input(f"Tokens to spend on discarded pre-generations [{budget_pref}]: ").strip()
+                if new_budget.isdigit():
+                    if 'preferences' not in settings: settings['preferences'] = {}
+                    settings['preferences']['speculate_budget_tokens'] = int(new_budget)
+                    save_settings(settings)
+                    print("✅ Preference updated.")
+                elif new_budget:
+                    print("❌ Please enter a whole number of tokens.")
+            elif pref_opt in ("1", "2", "3", "4", "5", "6"):
                 if 'preferences' not in settings: settings['preferences'] = {}
-                settings['preferences']['backup_before_evolve'] = not backup_pref
+                if pref_opt == "1":
+                    settings['preferences']['backup_before_evolve'] = not backup_pref
+                elif pref_opt == "2":
+                    settings['preferences']['stream_output'] = not stream_pref
+                elif pref_opt == "3":
+                    settings['preferences']['response_cache'] = not cache_pref
+                elif pref_opt == "4":
+                    settings['preferences']['failover'] = not failover_pref
+                elif pref_opt == "5":
+                    settings['preferences']['race'] = not race_pref
+                else:
+                    settings['preferences']['speculate'] = not speculate_pref
                 save_settings(settings)
                 print("✅ Preference updated.")
             elif pref_opt == "0":
                 continue
-            input("\nPress Enter to continue...")
\ No newline at end of file
+            input("\nPress Enter to continue...")
+
+        elif option == "4":
+            _download_model_menu(settings)
+            input("\nPress Enter to continue...")
@@ -1,4 +1,4 @@
-from core.utils import is_server_active
+from core.utils import is_server_active, get_startup_profile, get_cache_stats, load_provider_status, load_race_stats
 import os
 import shutil
 import platform
@@ -154,6 +154,17 @@ def _print_table(rows, title=None):
         print(f"| {label.ljust(left_w-2)}| {value.ljust(right_w-2)}|")
     print(sep)
 
+def _slowest_plugin_rows(limit=5):
+    """Rows for the slowest plugin imports from the last startup profile."""
+    rows = []
+    for r in get_startup_profile(limit=limit):
+        if r["delta"] is None:
+            trend = "new"
+        else:
+            trend = f"{r['delta'] * 1000:+.1f} ms"
+        rows.append((r["name"], f"{r['duration'] * 1000:.1f} ms ({trend})"))
+    return rows
+
 def run():
     os.system("clear")
     print("==========================================")
@@ -175,6 +186,42 @@ def run():
     ]
 
     _print_table(rows, title="System Health Report")
+
+    cache = get_cache_stats()
+    if cache:
+        lookups = cache["hits"] + cache["misses"]
+        hit_rate = f"{cache['hits'] / lookups * 100:.0f}%" if lookups else "n/a"
+        print()
+        _print_table([
+            ("Hits / Misses", f"{cache['hits']} / {cache['misses']} ({hit_rate} hit rate)"),
+            ("Entries", f"{cache['entries']} ({_human_bytes(cache['bytes'])} compressed)"),
+            ("Evictions", str(cache["evictions"])),
+        ], title="AI Response Cache")
+
+    status = load_provider_status()
+    if status and status.get("providers"):
+        age = time.time() - status["updated"]
+        rows = [(name, f"circuit {st['circuit']} · {st['failures']} failures · {st['rate_per_s']} req/s")
+                for name, st in sorted(status["providers"].items())]
+        print()
+        _print_table(rows, title=f"AI Providers ({age / 60:.0f} min ago)")
+
+    race_stats = load_race_stats()
+    if race_stats:
+        rows = []
+        for bucket in ("small", "medium", "large", "xlarge"):
+            for name, st in sorted(race_stats.get(bucket, {}).items()):
+                avg = f"{st['win_seconds'] / st['wins']:.1f}s avg win" if st["wins"] else "no wins"
+                rows.append((f"{bucket} · {name}", f"{st['wins']}/{st['races']} wins · {avg}"))
+        print()
+        _print_table(rows, title="Provider Races (by prompt size)")
+
+    slowest = _slowest_plugin_rows()
+    if slowest:
+        print()
+        _print_table(slowest, title="Slowest Plugins (import time vs last run)")
+    else:
+        print("\n💡 Run 'python main.py --profile-startup' to see the slowest plugins here.")
     print("\nNotes:")
     print(" - Values are snapshots. On some systems (e.g., desktops without battery) battery may be unavailable.")
     print(" - For more accurate results install 'psutil' (pip install psutil).")
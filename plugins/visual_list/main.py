@@ -1,13 +1,11 @@
 import os
-import subprocess
-import time
 import json
 import sys
 import html
 import webbrowser
 import shutil
 from urllib.parse import quote
-from core.utils import is_server_active
+from core.utils import is_server_active, start_static_server
 
 # Plugin Configuration
 config = {"label": "Visual Launcher", "icon": "📱"}
@@ -42,12 +40,7 @@ def _ensure_server():
     if start != "y":
         return False
     print("📡 Starting background server (port 8080)...")
-    try:
-        subprocess.Popen([sys.executable, "-m", "http.server", "8080"],
-                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        time.sleep(1)
-    except Exception as e:
-        print(f"⚠️ Failed to start server: {e}")
+    if not start_static_server(8080):
         return False
     return is_server_active()
 
@@ -0,0 +1,85 @@
+import os
+import sys
+import copy
+import json
+import threading
+import contextlib
+import http.server
+
+import pytest
+
+# Tests import the project the way main.py does: from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Empty working folder (config.json and .odinos land here) with cold provider state."""
+    monkeypatch.chdir(tmp_path)
+    from core import ai, resilience
+    ai.get_client().close()
+    resilience._limiters.clear()
+    resilience._breakers.clear()
+    return tmp_path
+
+def write_config(folder, **overrides):
+    """Writes a config.json with test keys; dict sections are merged over the defaults."""
+    from core.settings import DEFAULTS
+    data = copy.deepcopy(DEFAULTS)
+    data["api_keys"] = {"openai": "test-key", "anthropic": "test-key"}
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            data[key].update(value)
+        else:
+            data[key] = value
+    with open(os.path.join(folder, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return data
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    """Local HTTP stand-in on a free port that counts the TCP connections it accepts."""
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.connections = 0
+        self.requests = []
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+@contextlib.contextmanager
+def serve(handler):
+    server = StandInServer(handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class QuietHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive handler base that records request bodies and logs nothing."""
+    protocol_version = "HTTP/1.1"
+
+    def read_json(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.server.requests.append(body)
+        return body
+
+    def send_json(self, payload, status=200):
+        raw = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,43 @@
+import pytest
+
+from core import ai
+from conftest import QuietHandler, serve, write_config
+
+class ChatHandler(QuietHandler):
+    def do_POST(self):
+        body = self.read_json()
+        self.send_json({"choices": [{"message": {"content": f"echo: {body['messages'][-1]['content']}"}}]})
+
+def test_requests_reuse_one_pooled_connection(project):
+    with serve(ChatHandler) as server:
+        write_config(project, endpoints={"openai": server.url + "/v1/chat/completions"})
+        for i in range(3):
+            assert ai.ask_ai(f"hi {i}", "sys", stream=False) == f"echo: hi {i}"
+    assert len(server.requests) == 3
+    assert server.connections == 1
+
+def test_closed_client_opens_a_new_connection(project):
+    with serve(ChatHandler) as server:
+        write_config(project, endpoints={"openai": server.url + "/v1/chat/completions"})
+        ai.ask_ai("one", "sys", stream=False)
+        ai.get_client().close()
+        ai.ask_ai("two", "sys", stream=False)
+    assert server.connections == 2
+
+def test_warm_up_only_for_a_configured_remote_provider(project, monkeypatch):
+    warmed = []
+    monkeypatch.setattr(ai.get_client(), "warm", lambda provider, url: warmed.append(provider) or True)
+    # No config.json: nothing is contacted
+    assert ai.warm_provider(background=False) is False
+    write_config(project, api_keys={"openai": "", "anthropic": "test-key"})
+    assert ai.warm_provider("openai", background=False) is False
+    assert ai.warm_provider("anthropic", background=False) is True
+    assert warmed == ["anthropic"]
+
+def test_warm_up_never_loads_the_local_model(project, monkeypatch):
+    import core.local_llm
+    model = project / "model.gguf"
+    model.write_bytes(b"GGUF" + bytes(64))
+    write_config(project, active_provider="local", models={"local": str(model)})
+    monkeypatch.setattr(core.local_llm, "get_model", lambda *a, **k: pytest.fail("local model loaded"))
+    assert ai.warm_provider(background=False) is False
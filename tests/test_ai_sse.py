@@ -0,0 +1,76 @@
+import io
+import json
+
+from core import ai
+from conftest import QuietHandler, serve, write_config
+
+PIECES = ["Hel", "lo, ", "wor", "ld"]
+
+class SSEHandler(QuietHandler):
+    """OpenAI and Anthropic shaped chat endpoint: SSE when asked to stream, JSON otherwise."""
+    def do_POST(self):
+        body = self.read_json()
+        anthropic = self.path.startswith("/v1/messages")
+        if not body.get("stream"):
+            text = "".join(PIECES)
+            self.send_json({"content": [{"text": text}]} if anthropic else
+                           {"choices": [{"message": {"content": text}}]})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b": keep-alive comment\n\n")
+        for piece in PIECES:
+            if anthropic:
+                event = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": piece}}
+                self.wfile.write(f"event: content_block_delta\ndata: {json.dumps(event)}\n\n".encode())
+            else:
+                event = {"choices": [{"delta": {"content": piece}}]}
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b'event: message_stop\ndata: {"type": "message_stop"}\n\n' if anthropic else
+                         b"data: [DONE]\n\n")
+        self.close_connection = True
+
+def _configure(project, server, **overrides):
+    write_config(project, endpoints={"openai": server.url + "/v1/chat/completions",
+                                     "anthropic": server.url + "/v1/messages"}, **overrides)
+
+def test_iter_sse_joins_multiline_data_and_skips_comments():
+    lines = [": ping", "event: delta", "data: a", "data:b", "", "data: c", ""]
+    assert list(ai.iter_sse(lines)) == [("delta", "a\nb"), ("message", "c")]
+
+def test_streamed_openai_answer_arrives_in_pieces(project):
+    received = []
+    with serve(SSEHandler) as server:
+        _configure(project, server)
+        text = ai.ask_ai("hi", "sys", on_delta=received.append)
+    assert text == "Hello, world"
+    assert received == PIECES
+    assert server.requests[0]["stream"] is True
+
+def test_streamed_anthropic_answer(project):
+    with serve(SSEHandler) as server:
+        _configure(project, server, active_provider="anthropic")
+        assert ai.ask_ai("hi", "sys", stream=True) == "Hello, world"
+
+def test_streaming_is_opt_in(project):
+    with serve(SSEHandler) as server:
+        _configure(project, server)
+        assert ai.ask_ai("hi", "sys") == "Hello, world"
+        _configure(project, server, preferences={"stream_output": True})
+        assert ai.ask_ai("hi again", "sys") == "Hello, world"
+    assert "stream" not in server.requests[0]
+    assert server.requests[1]["stream"] is True
+
+def test_progress_counts_chunks_not_tokens():
+    out = io.StringIO()
+    progress = ai.StreamProgress(out=out)
+    for piece in PIECES:
+        progress.update(piece)
+    progress.finish()
+    stats = progress.stats()
+    assert stats["chunks"] == len(PIECES)
+    assert stats["chars"] == len("".join(PIECES))
+    assert "4 chunks" in out.getvalue()
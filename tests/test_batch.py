@@ -0,0 +1,34 @@
+import pytest
+
+from core import ai
+from core.apps import project_file, project_name
+from conftest import QuietHandler, serve, write_config
+
+class BatchHandler(QuietHandler):
+    def do_POST(self):
+        prompt = self.read_json()["messages"][-1]["content"]
+        if prompt == "broken":
+            self.send_json({"error": {"message": "bad request"}}, status=400)
+        else:
+            self.send_json({"choices": [{"message": {"content": f"done: {prompt}"}}]})
+
+@pytest.mark.parametrize("name, folder", [
+    ("../x", "x"),
+    ("../../etc/passwd", "etc_passwd"),
+    ("castle defense", "castle defense"),
+    ("calc.html", "calc"),
+    ("/", "new_app"),
+])
+def test_project_names_stay_inside_my_apps(name, folder):
+    assert project_name(name) == folder
+    assert project_file(name, web=True).split("/")[:2] == ["my_apps", folder]
+
+def test_batch_keeps_worker_output_for_the_caller(project, capsys):
+    with serve(BatchHandler) as server:
+        write_config(project, endpoints={"openai": server.url + "/v1/chat/completions"})
+        results = ai.ask_ai_batch(["one", "broken", "two"], "sys", max_concurrency=3)
+
+    assert [r["text"] for r in results] == ["done: one", None, "done: two"]
+    assert "HTTP 400" in results[1]["error"]
+    assert "API Error" in results[1]["log"]
+    assert capsys.readouterr().out == ""
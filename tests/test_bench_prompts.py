@@ -0,0 +1,28 @@
+import pytest
+
+from core import bench
+from conftest import ROOT
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+def test_every_prompt_source_yields_a_prompt():
+    names = {name.split("#")[0] for name, _, _ in bench.load_prompt_set()}
+    assert names == set(bench.PROMPT_SOURCES)
+
+def test_templates_are_read_without_placeholders():
+    prompts = dict((name, prompt) for name, prompt, _ in bench.load_prompt_set())
+    assert prompts["auto_envolve#1"].startswith("YOU ARE A TERMINAL CODE GENERATOR.")
+    assert "{context}" not in prompts["auto_envolve#1"]
+
+def test_extracts_strings_concatenations_and_fstrings(tmp_path):
+    plugin = tmp_path / "plugin.py"
+    plugin.write_text(
+        'A_SYS_PROMPT = "one " + "two"\n'
+        'def build(x):\n'
+        '    sys_prompt = f"three {x} four"\n'
+        '    other = "ignored"\n'
+        '    dynamic_sys_prompt = build_it(x)\n'
+    )
+    assert bench.extract_system_prompts(str(plugin)) == ["one two", "three four"]
@@ -0,0 +1,55 @@
+import random
+import zlib
+
+import pytest
+
+from core import cache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Deterministic time.time() for the cache, one second per call."""
+    ticks = iter(range(1, 10**6))
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(ticks)))
+
+def _text(seed):
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(2000))
+
+def _stored_size(text):
+    return len(zlib.compress(text.encode("utf-8"), 6))
+
+def test_key_covers_every_input():
+    base = cache.cache_key("openai", "m", "sys", "hi")
+    assert base == cache.cache_key("openai", "m", "sys", "hi")
+    assert base != cache.cache_key("anthropic", "m", "sys", "hi")
+    assert base != cache.cache_key("openai", "m2", "sys", "hi")
+    assert base != cache.cache_key("openai", "m", "sys2", "hi")
+    assert base != cache.cache_key("openai", "m", "sys", "hi", [{"role": "user", "content": "x"}])
+
+def test_round_trip_and_counters(tmp_path):
+    store = cache.ResponseCache(str(tmp_path / "c.sqlite3"))
+    assert store.get("k") is None
+    store.put("k", "héllo ✨")
+    assert store.get("k") == "héllo ✨"
+    stats = store.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    a, b, c = _text(1), _text(2), _text(3)
+    size = max(_stored_size(t) for t in (a, b, c))
+    store = cache.ResponseCache(str(tmp_path / "c.sqlite3"), max_bytes=int(size * 2.5))
+    store.put("a", a)
+    store.put("b", b)
+    # Reading "a" makes "b" the least recently used entry
+    assert store.get("a") == a
+    store.put("c", c)
+    assert store.get("b") is None
+    assert store.get("a") == a
+    assert store.get("c") == c
+    assert store.stats()["evictions"] == 1
+
+def test_clear(tmp_path):
+    store = cache.ResponseCache(str(tmp_path / "c.sqlite3"))
+    store.put("k", "v")
+    store.clear()
+    assert store.stats() == {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from core import context
+
+@pytest.fixture
+def source_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "core").mkdir()
+    (tmp_path / "core" / "cache.py").write_text("def lookup(key):\n    return key\n")
+    (tmp_path / "main.py").write_text("print('menu')\n")
+    (tmp_path / "config.json").write_text('{"api_keys": {"openai": "sk-secret"}}')
+    return tmp_path
+
+def test_snapshot_holds_every_source_file_but_the_keys(source_tree):
+    assert context.update_context_file() == ("totalcode.txt", 2)
+    text = (source_tree / "totalcode.txt").read_text()
+    assert "FILE: ./core/cache.py" in text and "FILE: ./main.py" in text
+    assert "sk-secret" not in text
+
+def test_unchanged_tree_does_not_rewrite_the_snapshot(source_tree, monkeypatch):
+    context.update_context_file()
+    before = os.stat(source_tree / "totalcode.txt").st_mtime_ns
+
+    reads = []
+    real_open = open
+    def counting_open(path, mode="r", *args, **kwargs):
+        reads.append((str(path), mode))
+        return real_open(path, mode, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    assert context.update_context_file() == ("totalcode.txt", 0)
+    assert os.stat(source_tree / "totalcode.txt").st_mtime_ns == before
+    # Only the manifest is read; no source file, section or snapshot is opened
+    assert [p for p, _ in reads] == [context.MANIFEST_FILE]
+
+def test_only_changed_files_are_read_again(source_tree, monkeypatch):
+    context.update_context_file()
+    (source_tree / "main.py").write_text("print('new menu')\n")
+
+    reads = []
+    real_open = open
+    def counting_open(path, mode="r", *args, **kwargs):
+        reads.append(str(path))
+        return real_open(path, mode, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", counting_open)
+
+    assert context.update_context_file() == ("totalcode.txt", 1)
+    assert "./main.py" in reads and "./core/cache.py" not in reads
+    assert "new menu" in (source_tree / "totalcode.txt").read_text()
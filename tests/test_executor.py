@@ -0,0 +1,34 @@
+import os
+import time
+import signal
+import threading
+import types
+
+import pytest
+
+from core import executor
+
+pytestmark = pytest.mark.skipif(not executor.is_supported(), reason="needs os.fork")
+
+def sleepy_plugin():
+    # A plugin that would sit there for a long time unless Ctrl+C gets through
+    return types.SimpleNamespace(run=lambda: time.sleep(30))
+
+def test_sigint_reaches_the_forked_plugin():
+    # Outside the terminal foreground (daemon session) the signal only hits the parent
+    timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    try:
+        stats = executor.run_plugin(sleepy_plugin())
+    finally:
+        timer.cancel()
+    assert stats["code"] == 130
+    assert stats["wall"] < 10
+    # The menu's own handler is back once the plugin is gone
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+def test_plugin_exit_codes():
+    def fail():
+        raise SystemExit(3)
+    assert executor.run_plugin(types.SimpleNamespace(run=fail))["code"] == 3
+    assert executor.run_plugin(types.SimpleNamespace(run=lambda: None))["code"] == 0
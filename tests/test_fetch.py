@@ -0,0 +1,120 @@
+import os
+import re
+import time
+import hashlib
+import threading
+
+import pytest
+import requests
+
+from core import fetch
+from conftest import QuietHandler, serve
+
+DATA = os.urandom(300 * 1024)
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+class RangeHandler(QuietHandler):
+    """
+    Serves DATA. server.ranges toggles Range support; server.cut_first makes
+    that many responses die halfway; server.delay slows every write down.
+    """
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers.get("Range"))
+        start, end = 0, len(DATA) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if server.ranges and match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        body = DATA[start:end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        with server.lock:
+            cut = server.cut_first > 0 and len(body) > 1
+            server.cut_first -= cut
+        if cut:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        for i in range(0, len(body), 8192):
+            self.wfile.write(body[i:i + 8192])
+            time.sleep(server.delay)
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(fetch, "SEGMENT_SIZE", 32 * 1024)
+    monkeypatch.setattr(fetch, "READ_SIZE", 8 * 1024)
+    with serve(RangeHandler) as srv:
+        srv.ranges, srv.cut_first, srv.delay, srv.lock = True, 0, 0, threading.Lock()
+        yield srv
+
+def _download(server, tmp_path, **kwargs):
+    target = tmp_path / "models" / "model.gguf"
+    digest = fetch.download(server.url + "/model.gguf", str(target), session=requests.Session(),
+                            show_progress=False, **kwargs)
+    return target, digest
+
+def test_parallel_ranged_download(server, tmp_path):
+    target, digest = _download(server, tmp_path, sha256=DIGEST, workers=4)
+    assert digest == DIGEST
+    assert target.read_bytes() == DATA
+    assert not os.path.exists(fetch._part_path(str(target)))
+    assert not os.path.exists(fetch._progress_path(str(target)))
+    # Probe plus one ranged request per segment
+    assert len(server.requests) > 2 and all(r and r.startswith("bytes=") for r in server.requests)
+
+def test_segment_resumes_from_its_offset_after_a_drop(server, tmp_path):
+    server.cut_first = 2
+    target, digest = _download(server, tmp_path, sha256=DIGEST, workers=2)
+    assert digest == DIGEST
+    assert target.read_bytes() == DATA
+    resumed = [r for r in server.requests[1:] if not r.endswith(f"-{len(DATA) - 1}") and
+               int(r[6:].split("-")[0]) % fetch.SEGMENT_SIZE]
+    assert resumed, "a retried segment should ask for its unfinished tail only"
+
+def test_server_without_range_restarts_from_zero_after_a_drop(server, tmp_path):
+    server.ranges = False
+    server.cut_first = 2  # the probe and the first full download both die halfway
+    target, digest = _download(server, tmp_path, sha256=DIGEST)
+    assert digest == DIGEST
+    assert target.read_bytes() == DATA
+
+def test_checksum_mismatch_discards_the_download(server, tmp_path):
+    with pytest.raises(RuntimeError, match="SHA-256 mismatch"):
+        _download(server, tmp_path, sha256="0" * 64)
+    target = str(tmp_path / "models" / "model.gguf")
+    assert not os.path.exists(target) and not os.path.exists(fetch._part_path(target))
+
+def test_interrupt_stops_workers_before_the_hasher(server, tmp_path, monkeypatch):
+    server.delay = 0.02
+
+    class InterruptedClock:
+        """fetch's view of time: Ctrl+C arrives at the first progress tick."""
+        monotonic = staticmethod(time.monotonic)
+
+        @staticmethod
+        def sleep(seconds):
+            time.sleep(0.1)
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(fetch, "time", InterruptedClock)
+    with pytest.raises(KeyboardInterrupt):
+        _download(server, tmp_path, workers=4)
+    assert not [t for t in threading.enumerate() if t.name == "fetch-segment" and t.is_alive()]
+
+    part = fetch._part_path(str(tmp_path / "models" / "model.gguf"))
+    with open(part, "rb") as f:
+        before = f.read()
+    time.sleep(0.3)
+    with open(part, "rb") as f:
+        assert f.read() == before
+
+    # The saved progress lets the next run finish the file
+    monkeypatch.setattr(fetch, "time", time)
+    server.delay = 0
+    target, digest = _download(server, tmp_path, sha256=DIGEST, workers=4)
+    assert target.read_bytes() == DATA
@@ -0,0 +1,72 @@
+import struct
+
+import pytest
+
+from core import gguf
+
+def _string(text):
+    raw = text.encode("utf-8")
+    return struct.pack("<Q", len(raw)) + raw
+
+def _kv(key, vtype, payload):
+    return _string(key) + struct.pack("<I", vtype) + payload
+
+def write_gguf(path, metadata_file_type=True, version=3):
+    """Synthetic GGUF: real header layout, metadata and tensor table, no weights."""
+    kvs = [
+        _kv("general.architecture", 8, _string("llama")),
+        _kv("general.name", 8, _string("Tiny Test")),
+        _kv("llama.context_length", 4, struct.pack("<I", 4096)),
+        _kv("tokenizer.ggml.tokens", 9, struct.pack("<IQ", 8, 3) + b"".join(_string(t) for t in ("a", "bb", "ccc"))),
+        _kv("tokenizer.ggml.scores", 9, struct.pack("<IQ", 6, 2) + struct.pack("<ff", 0.5, 1.5)),
+    ]
+    if metadata_file_type:
+        kvs.append(_kv("general.file_type", 4, struct.pack("<I", 15)))
+    tensors = [
+        # name, dims, ggml type (12 = Q4_K, 0 = F32)
+        ("token_embd.weight", (64, 32), 12),
+        ("output_norm.weight", (64,), 0),
+    ]
+    body = b"GGUF" + struct.pack("<IQQ", version, len(tensors), len(kvs)) + b"".join(kvs)
+    for name, dims, ttype in tensors:
+        body += _string(name) + struct.pack("<I", len(dims)) + b"".join(struct.pack("<Q", d) for d in dims)
+        body += struct.pack("<IQ", ttype, 0)
+    path.write_bytes(body)
+    return path
+
+def test_reads_metadata_and_tensor_table(tmp_path):
+    info = gguf.read_header(str(write_gguf(tmp_path / "tiny.gguf")))
+    assert info == {"format": "GGUF v3", "name": "Tiny Test", "architecture": "llama",
+                    "parameters": 64 * 32 + 64, "quantization": "Q4_K_M",
+                    "context_length": 4096, "tensor_count": 2}
+
+def test_quantization_falls_back_to_dominant_tensor_type(tmp_path):
+    info = gguf.read_header(str(write_gguf(tmp_path / "tiny.gguf", metadata_file_type=False)))
+    assert info["quantization"] == "Q4_K"
+
+@pytest.mark.parametrize("content, message", [
+    (b"", "empty file"),
+    (b"lmgg" + b"\0" * 16, "legacy GGML"),
+    (b"PK\3\4" + b"\0" * 16, "not a GGUF file"),
+])
+def test_rejects_non_gguf_files(tmp_path, content, message):
+    path = tmp_path / "bad.gguf"
+    path.write_bytes(content)
+    with pytest.raises(ValueError, match=message):
+        gguf.read_header(str(path))
+
+def test_catalog_rereads_only_changed_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "models").mkdir()
+    write_gguf(tmp_path / "models" / "tiny.gguf")
+    (tmp_path / "models" / "notes.txt").write_text("ignored")
+    assert [e["quantization"] for e in gguf.list_models()] == ["Q4_K_M"]
+
+    reads = []
+    monkeypatch.setattr(gguf, "read_header", lambda path: reads.append(path) or {})
+    gguf.list_models()
+    assert reads == []
+
+def test_human_params():
+    assert gguf.human_params(1543714304) == "1.5B"
+    assert gguf.human_params(2112) == "2.1K"
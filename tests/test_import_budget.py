@@ -0,0 +1,30 @@
+import pytest
+
+from core import profiler
+from conftest import ROOT
+
+HEAVY_MODULES = ("requests", "dotenv")
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+def test_import_budgets():
+    assert profiler.check_import_budgets()
+
+@pytest.mark.parametrize("statement", [
+    "from core.utils import is_server_active",
+    "from core.utils import get_settings",
+])
+def test_light_helpers_skip_heavy_dependencies(statement):
+    loaded = profiler.loaded_modules(statement)
+    assert {"core.services", "core.settings"} & loaded
+    assert not loaded.intersection(HEAVY_MODULES)
+
+def test_server_helpers_load_daemon():
+    # is_server_active lives in core.services, which pulls in core.daemon
+    assert {"core.services", "core.daemon"} <= profiler.loaded_modules("from core.utils import is_server_active")
+
+def test_app_modules_leave_numpy_to_the_first_search():
+    # core.apps pulls in html_sections and core.retrieval, which score with NumPy
+    assert "numpy" not in profiler.loaded_modules("import core.apps")
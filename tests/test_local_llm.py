@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from core import ai, local_llm
+from conftest import write_config
+
+WORDS = ["tiny ", "stub ", "model ", "answer"]
+
+class StubModel:
+    """Stands in for llama_cpp.Llama: streams WORDS and records what it was asked."""
+    def __init__(self):
+        self.calls = []
+        self.closed = 0
+
+    def create_chat_completion(self, messages, stream, max_tokens):
+        self.calls.append(messages)
+        try:
+            yield {"choices": [{"delta": {"role": "assistant"}}]}
+            for word in WORDS:
+                yield {"choices": [{"delta": {"content": word}}]}
+        except GeneratorExit:
+            self.closed += 1
+            raise
+
+@pytest.fixture
+def stub(project):
+    model = StubModel()
+    loads = []
+
+    def factory(model_path, n_ctx, n_threads, cache_bytes):
+        loads.append((model_path, n_ctx, n_threads))
+        return model
+
+    (project / "models").mkdir()
+    (project / "models" / "stub.gguf").write_bytes(b"")
+    write_config(project, active_provider="local", models={"local": "models/stub.gguf"},
+                 local={"threads": 1, "n_ctx": 512})
+    local_llm.set_backend_factory(factory)
+    model.loads = loads
+    yield model
+    local_llm.set_backend_factory(None)
+
+def _in_thread(fn, timeout=5):
+    """Runs fn in a thread and fails instead of hanging when it deadlocks."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "generation blocked: the model lock was never released"
+    return result.get("value")
+
+def test_streams_deltas_and_keeps_model_resident(stub):
+    history = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "reply"}]
+    assert ai.ask_ai("hi", "sys", history=history) == "".join(WORDS)
+    assert ai.ask_ai("again", "sys") == "".join(WORDS)
+    assert len(stub.loads) == 1
+    assert [m["role"] for m in stub.calls[0]] == ["system", "user", "assistant", "user"]
+
+def test_closing_early_releases_the_model(stub):
+    settings = ai._load_settings()
+    deltas = local_llm.stream_chat(settings, "sys", "hi")
+    assert next(deltas) == WORDS[0]
+    deltas.close()
+    assert stub.closed == 1
+    assert _in_thread(lambda: "".join(local_llm.stream_chat(settings, "sys", "next"))) == "".join(WORDS)
+
+def test_cancelled_request_releases_the_model(stub):
+    cancel = threading.Event()
+    assert ai.ask_ai("hi", "sys", cancel=cancel, on_delta=lambda _: cancel.set()) is None
+    assert _in_thread(lambda: ai.ask_ai("next", "sys")) == "".join(WORDS)
@@ -0,0 +1,75 @@
+import pytest
+
+from core import apps, patch
+
+PAGE = """<!DOCTYPE html>
+<html>
+<body>
+  <h1>Tip calculator</h1>
+  <script>
+    function total(bill, tip) {
+      return bill * (1 + tip);
+    }
+  </script>
+</body>
+</html>
+"""
+
+def block(search, replace):
+    return f"{patch.SEARCH_MARK}\n{search}\n{patch.DIVIDER}\n{replace}\n{patch.REPLACE_MARK}"
+
+def test_parse_blocks_ignores_chatter():
+    reply = "Sure!\n" + block("a = 1", "a = 2") + "\nand\n" + block("", "b = 3") + "\n>>>>>>> REPLACE"
+    assert patch.parse_blocks(reply) == [("a = 1", "a = 2"), ("", "b = 3")]
+
+def test_exact_block_is_replaced():
+    new = patch.apply_reply(PAGE, block("  <h1>Tip calculator</h1>", "  <h1>Tip & split</h1>"))
+    assert "<h1>Tip & split</h1>" in new and "Tip calculator" not in new
+
+def test_wrong_indentation_is_located_and_reindented():
+    reply = block("function total(bill, tip) {\n  return bill * (1 + tip);\n}",
+                  "function total(bill, tip) {\n  return Math.round(bill * (1 + tip));\n}")
+    new = patch.apply_reply(PAGE, reply)
+    assert "      return Math.round(bill * (1 + tip));" in new
+
+def test_near_miss_is_located_fuzzily():
+    reply = block("    function total(bill, tip){\n      return bill * (1 + tip);",
+                  "    function total(bill, tip) {\n      return bill + bill * tip;")
+    assert "return bill + bill * tip;" in patch.apply_reply(PAGE, reply)
+
+def test_ambiguous_and_missing_blocks_are_rejected():
+    source = "x = 1\ny = 2\nx = 1\n"
+    with pytest.raises(patch.PatchError, match="matches 2 places"):
+        patch.apply_blocks(source, [("x = 1", "x = 3")])
+    with pytest.raises(patch.PatchError, match="not found"):
+        patch.apply_blocks(source, [("completely different line", "z")])
+    with pytest.raises(patch.PatchError, match="no patch blocks"):
+        patch.apply_reply(source, "I rewrote everything for you")
+
+def test_empty_search_goes_inside_the_body():
+    new = patch.apply_reply(PAGE, block("", "  <footer>v2</footer>"))
+    assert new.endswith("  <footer>v2</footer>\n</body>\n</html>\n")
+
+def test_empty_search_appends_to_scripts():
+    assert patch.apply_blocks("x = 1\n", [("", "y = 2")]) == "x = 1\ny = 2\n"
+
+def test_verify_catches_broken_results():
+    assert patch.verify(PAGE, PAGE.replace("</script>", "")) == "unbalanced <script> tags"
+    assert patch.verify(PAGE, PAGE.replace("</html>", "")) == "closing </html> tag lost"
+    assert patch.verify("x = 1\n", "def f(:\n").startswith("syntax error on line 1")
+    assert patch.verify("x = 1\n", "  \n") == "patched file is empty"
+    with pytest.raises(patch.PatchError, match="unbalanced"):
+        patch.apply_reply(PAGE, block("  </script>", ""))
+
+def test_improve_code_returns_patched_code_untouched(monkeypatch):
+    # A page that shows markdown: its ``` fences are content, not formatting
+    page = PAGE.replace("<h1>Tip calculator</h1>", "<pre>```js\nlet a = 1;\n```</pre>")
+    reply = block("  <script>", '  <script>\n    const fence = "```";') + "\n---SUGERENCIA---\nAdd a reset button"
+    monkeypatch.setattr(apps, "ask_ai", lambda *args, **kwargs: reply)
+    code, suggestion = apps.improve_code(page, "add a fence constant")
+    assert code == page.replace("  <script>", '  <script>\n    const fence = "```";')
+    assert suggestion == "Add a reset button"
+
+def test_improve_code_reports_nothing_usable(monkeypatch):
+    monkeypatch.setattr(apps, "ask_ai", lambda *args, **kwargs: None)
+    assert apps.improve_code(PAGE, "anything") == (None, "")
@@ -0,0 +1,63 @@
+import json
+import time
+import threading
+
+import pytest
+
+from core import ai, resilience
+from conftest import QuietHandler, serve, write_config
+
+class RaceHandler(QuietHandler):
+    """/fast answers over SSE at once; /slow is overloaded (503) and makes its client back off."""
+    def do_POST(self):
+        body = self.read_json()
+        self.server.paths.append(self.path)
+        if self.path == "/slow":
+            self.send_json({"error": {"message": "overloaded"}}, status=503)
+            return
+        if not body.get("stream"):
+            self.send_json({"choices": [{"message": {"content": "fast answer"}}]})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunk = {"choices": [{"delta": {"content": "fast answer"}}]}
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode())
+        self.close_connection = True
+
+@pytest.fixture
+def racing(project, monkeypatch):
+    # The losing provider's first backoff lasts half a second
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 0.5)
+    with serve(RaceHandler) as server:
+        server.paths = []
+        write_config(project, endpoints={"openai": server.url + "/fast", "anthropic": server.url + "/slow"},
+                     preferences={"race": True})
+        yield server
+
+def test_loser_in_backoff_sends_no_retry(racing):
+    assert ai.ask_ai("hi", "sys") == "fast answer"
+    time.sleep(1.0)
+    assert racing.paths.count("/slow") == 1
+
+def test_batch_requests_do_not_race(racing):
+    results = ai.ask_ai_batch(["a", "b"], "sys")
+    assert [r["text"] for r in results] == ["fast answer", "fast answer"]
+    assert "/slow" not in racing.paths
+
+def test_cancel_stops_retries(project, monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: 5.0)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    attempts = []
+
+    def attempt():
+        attempts.append(1)
+        raise resilience.RetryableError("HTTP 503")
+
+    started = time.monotonic()
+    with pytest.raises(resilience.RequestCancelled):
+        resilience.call("openai", attempt, cancel=cancel)
+    assert attempts == [1]
+    assert time.monotonic() - started < 2
@@ -0,0 +1,157 @@
+import time
+import threading
+
+import pytest
+
+from core import resilience
+
+class FakeClock:
+    """Stands in for the time module inside core.resilience."""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    resilience._limiters.clear()
+    resilience._breakers.clear()
+    return fake
+
+def test_bucket_spends_burst_then_paces(clock):
+    bucket = resilience.TokenBucket(rate=2.0, capacity=3.0)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert sum(clock.sleeps) == pytest.approx(0.5)
+
+def test_bucket_follows_rate_limit_headers(clock):
+    bucket = resilience.TokenBucket()
+    bucket.update_from_headers({"x-ratelimit-limit-requests": "120", "x-ratelimit-remaining-requests": "0",
+                                "x-ratelimit-reset-requests": "6s"})
+    assert bucket.rate == pytest.approx(2.0)
+    assert bucket.tokens == 0
+    bucket.acquire()
+    assert clock.now >= 1006.0
+
+def test_parse_reset_formats():
+    assert resilience._parse_duration("6m0s") == 360
+    assert resilience._parse_duration("120ms") == pytest.approx(0.12)
+    assert resilience._parse_duration("1.5") == 1.5
+    assert resilience.retry_after_seconds({"retry-after": "7"}) == 7
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now += 30
+    assert breaker.allow() and breaker.state == "half_open"
+    # One failed trial call reopens it at once
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+def test_half_open_breaker_lets_a_single_probe_through(clock):
+    breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    # Everybody else waits for the probe's verdict
+    assert not breaker.allow() and not breaker.allow()
+    breaker.end_probe()
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+def test_probe_without_verdict_hands_over_to_the_next_caller(clock):
+    breaker = resilience.breaker_for("openai")
+    breaker.state, breaker.opened_at = "open", clock.now - breaker.reset_timeout
+
+    def bad_request():
+        # Not the provider's fault: no verdict, but the probe slot must not leak
+        assert not breaker.allow()
+        raise ValueError("HTTP 400")
+
+    with pytest.raises(ValueError):
+        resilience.call("openai", bad_request)
+    assert breaker.state == "half_open"
+    assert resilience.call("openai", lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+def test_cancel_cuts_a_retry_after_pause_short(clock):
+    bucket = resilience.TokenBucket()
+    bucket.block_for(600)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    started = time.perf_counter()
+    with pytest.raises(resilience.RequestCancelled):
+        bucket.acquire(cancel)
+    assert time.perf_counter() - started < 2
+    assert clock.sleeps == []
+
+def test_call_retries_retryable_errors_with_backoff(clock):
+    attempts = []
+
+    def attempt():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise resilience.RetryableError("HTTP 503")
+        return "ok"
+
+    assert resilience.call("openai", attempt) == "ok"
+    assert len(attempts) == 3
+    assert resilience.breaker_for("openai").state == "closed"
+
+def test_call_honours_retry_after(clock):
+    attempts = []
+
+    def attempt():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise resilience.RetryableError("HTTP 429", retry_after=20)
+        return "ok"
+
+    resilience.call("openai", attempt)
+    assert attempts[1] - attempts[0] >= 20
+
+def test_exhausted_retries_count_against_the_breaker(clock):
+    def attempt():
+        raise resilience.RetryableError("HTTP 500")
+
+    for _ in range(3):
+        with pytest.raises(resilience.RetryableError):
+            resilience.call("anthropic", attempt, max_attempts=2)
+    with pytest.raises(resilience.CircuitOpenError):
+        resilience.call("anthropic", attempt)
+    assert resilience.load_provider_status()["providers"]["anthropic"]["circuit"] == "open"
+
+def test_other_errors_are_raised_at_once(clock):
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise RuntimeError("HTTP 401: bad key")
+
+    with pytest.raises(RuntimeError):
+        resilience.call("openai", attempt)
+    assert len(calls) == 1
+    assert resilience.breaker_for("openai").failures == 0
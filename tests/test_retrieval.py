@@ -0,0 +1,56 @@
+import pytest
+
+from core import retrieval
+
+def test_tokenize_splits_identifiers_and_drops_stopwords():
+    terms = retrieval.tokenize("def build_context(self): return getSettings()")
+    assert "build_context" in terms and "build" in terms and "context" in terms
+    assert "getsettings" in terms and "get" in terms and "settings" in terms
+    assert "def" not in terms and "self" not in terms and "return" not in terms
+
+def test_chunks_prefer_definition_boundaries():
+    lines = ["x = 1"] * 25 + ["def f():"] + ["    pass"] * 10
+    assert retrieval.chunk_lines(lines) == [(0, 25), (25, 36)]
+    assert retrieval.chunk_lines(["x"] * 200)[0] == (0, retrieval.CHUNK_LINES * 2)
+
+def test_bm25_ranks_rare_matching_terms_first():
+    tfs = [{"cache": 3, "sqlite": 1}, {"cache": 1}, {"menu": 4}]
+    scores = list(retrieval.bm25_scores(tfs, [10, 10, 10], ["cache", "sqlite"]))
+    assert scores[0] > scores[1] > scores[2] == 0
+
+def test_numpy_and_pure_python_scores_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    tfs = [{"a": 2, "b": 1}, {"b": 5}, {"c": 1}, {"a": 1, "c": 2}]
+    lengths, terms = [12, 30, 5, 9], ["a", "b", "c"]
+    fast = list(retrieval.bm25_scores(tfs, lengths, terms))
+    monkeypatch.setattr(retrieval, "_numpy", lambda: None)
+    slow = retrieval.bm25_scores(tfs, lengths, terms)
+    assert fast == pytest.approx(slow)
+
+@pytest.fixture
+def source_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "core").mkdir()
+    (tmp_path / "core" / "cache.py").write_text("def response_cache_lookup(key):\n    return sqlite_fetch(key)\n")
+    (tmp_path / "core" / "menu.py").write_text("def render_menu(items):\n    print(items)\n")
+    (tmp_path / "config.json").write_text('{"api_keys": {"openai": "sk-secret cache"}}')
+    return tmp_path
+
+def test_index_search_and_incremental_refresh(source_tree):
+    index = retrieval.RetrievalIndex()
+    assert index.refresh() == 2
+    assert [path for _, path, _ in index.search("sqlite cache lookup")] == ["./core/cache.py"]
+    assert retrieval.RetrievalIndex().refresh() == 0
+
+    (source_tree / "core" / "menu.py").write_text("def render_menu(items, cache):\n    print(items)\n")
+    (source_tree / "core" / "cache.py").unlink()
+    index = retrieval.RetrievalIndex()
+    assert index.refresh() == 2
+    assert [path for _, path, _ in index.search("cache")] == ["./core/menu.py"]
+
+def test_context_never_includes_config_and_respects_budget(source_tree):
+    context = retrieval.build_context("cache sqlite menu secret", token_budget=1000)
+    assert "FILE: ./core/cache.py" in context
+    assert "sk-secret" not in context and "config.json" not in context
+    assert retrieval.build_context("cache sqlite menu", token_budget=5) == ""
+    assert "cache.py" not in retrieval.build_context("sqlite cache", exclude=["core/cache.py"])
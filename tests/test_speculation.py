@@ -0,0 +1,80 @@
+import sys
+import threading
+
+from core import apps, console, html_sections
+from core.speculative import Speculation
+from conftest import write_config
+
+def test_streams_are_swapped_once_before_the_thread_starts(capsys):
+    release = threading.Event()
+
+    def work(cancel):
+        print("from the background")
+        release.wait(5)
+        return 42
+
+    speculation = Speculation(work)
+    stdout = sys.stdout
+    assert isinstance(stdout, console.ThreadOutput)
+    print("typed by the main thread")
+    release.set()
+    assert speculation.result() == 42
+    # Finishing the background work leaves the streams alone
+    assert sys.stdout is stdout
+    assert capsys.readouterr().out == "typed by the main thread\nfrom the background\n"
+
+def test_cancel_reaches_the_function():
+    speculation = Speculation(lambda cancel: cancel.wait(5))
+    speculation.cancel()
+    assert speculation.result() is True
+
+def _session(project, monkeypatch, proposal):
+    write_config(project, preferences={"speculate": True, "speculate_budget_tokens": 10**6})
+    session = apps.AppSession("x = 1\n", "demo", suggestion="add y")
+    calls = []
+
+    def propose(improvement, cancel=None):
+        calls.append(improvement)
+        return proposal
+
+    monkeypatch.setattr(session, "propose", propose)
+    return session, calls
+
+def test_failed_speculation_is_not_paid_twice(project, monkeypatch):
+    session, calls = _session(project, monkeypatch, None)
+    assert session.speculate() is not None
+    assert session.take_speculation() is False
+    assert calls == ["add y"]
+    assert session.wasted_tokens == session._speculation_cost()
+
+def test_successful_speculation_is_accepted(project, monkeypatch):
+    session, calls = _session(project, monkeypatch, {"code": "x = 2\n", "suggestion": "next", "history": []})
+    session.speculate()
+    assert session.take_speculation() is True
+    assert (session.code, session.suggestion, session.wasted_tokens) == ("x = 2\n", "next", 0)
+
+def test_section_routing_request_gets_the_cancel_event(monkeypatch):
+    page = "<html><body>\n" + "<p>zzz</p>\n" * (html_sections.LARGE_APP_CHARS // 10) + "</body></html>\n"
+    cancel = threading.Event()
+    calls = []
+
+    def ask_ai(prompt, system_prompt, **kwargs):
+        calls.append(kwargs)
+        cancel.set()
+        return "0"
+
+    monkeypatch.setattr(apps, "ask_ai", ask_ai)
+    assert apps.improve_code(page, "qqq", cancel) == (None, "")
+    assert calls == [{"cancel": cancel, "stream": True}]
+
+def test_speculation_stays_within_the_budget(project, monkeypatch):
+    session, calls = _session(project, monkeypatch, None)
+    write_config(project, preferences={"speculate": True, "speculate_budget_tokens": 0})
+    assert session.speculate() is None
+    assert calls == []
+
+def test_budget_default_comes_from_the_settings_defaults(project):
+    from core.settings import DEFAULTS, get_settings
+    (project / "config.json").write_text('{"preferences": {"speculate": true}}')
+    assert get_settings().pref("speculate_budget_tokens") == DEFAULTS["preferences"]["speculate_budget_tokens"]
+    assert get_settings().pref("speculate_budget_tokens", 5) == 5
@@ -0,0 +1,101 @@
+import json
+import random
+
+import pytest
+
+from core import ai, apps
+from core.stream_parser import MarkerStreamParser, ProgressiveFile
+from conftest import QuietHandler, serve, write_config
+
+ANSWERS = [
+    "Here you go!\n---CODIGO---\n```html\n<!DOCTYPE html>\n<html>\n\n<body>\n  <p>hi</p>\n\n\n</body>\n</html>\n```\n"
+    "---SUGERENCIA---\n  Add a dark mode toggle.",
+    "---CODIGO---\nprint('no fences')\n",
+    "---CODIGO---\n\n\n<html>\n<pre>\n```\ncode\n```\n</pre>\n</html>\n---SUGERENCIA---",
+    "No markers at all",
+]
+
+def _parse_stream(text, splits):
+    code, suggestion = [], []
+    parser = MarkerStreamParser(code.append, suggestion.append)
+    cuts = [0] + sorted(splits) + [len(text)]
+    for start, end in zip(cuts, cuts[1:]):
+        parser.feed(text[start:end])
+    parser.finish()
+    return "".join(code), "".join(suggestion)
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_random_splits_match_the_batch_parser(answer):
+    expected_code, expected_suggestion = apps.parse_ai_response(answer)
+    rng = random.Random(answer)
+    for _ in range(200):
+        splits = rng.sample(range(1, len(answer)), rng.randint(0, min(20, len(answer) - 1)))
+        code, suggestion = _parse_stream(answer, splits)
+        assert code == (expected_code or "")
+        assert suggestion == expected_suggestion
+
+def test_every_single_character_split():
+    answer = ANSWERS[0]
+    assert _parse_stream(answer, range(1, len(answer))) == apps.parse_ai_response(answer)
+
+def test_progressive_file_commit_and_abort(tmp_path):
+    target = tmp_path / "app" / "index.html"
+    writer = ProgressiveFile(str(target))
+    writer.write("<html>\n")
+    assert (tmp_path / "app" / ".index.partial.html").read_text() == "<html>\n"
+    writer.commit()
+    assert target.read_text() == "<html>\n"
+
+    writer = ProgressiveFile(str(target))
+    writer.write("<html>broken")
+    writer.abort()
+    assert target.read_text() == "<html>\n"
+    assert not (tmp_path / "app" / ".index.partial.html").exists()
+
+FIRST = "---CODIGO---\n<html>\n<body>FROM THE FAILED PROVIDER"
+SECOND = "---CODIGO---\n<html>\n<body>second</body>\n</html>\n---SUGERENCIA---\nAdd colors."
+
+class FailingOverHandler(QuietHandler):
+    """/dies streams half an answer and drops the connection; /works streams a whole one."""
+    def do_POST(self):
+        self.read_json()
+        dies = self.path == "/dies"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in [FIRST[:20], FIRST[20:]] if dies else [SECOND[:30], SECOND[30:]]:
+            event = {"choices": [{"delta": {"content": piece}}]}
+            raw = f"data: {json.dumps(event)}\n\n".encode()
+            self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+            self.wfile.flush()
+        if not dies:
+            raw = b"data: [DONE]\n\n"
+            self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n0\r\n\r\n")
+        self.close_connection = True
+
+def test_failover_restarts_the_streamed_file(project, monkeypatch, capsys):
+    # Both stand-in providers answer in OpenAI's SSE shape, only their URLs differ
+    openai_deltas = ai.iter_deltas
+    monkeypatch.setattr(ai, "iter_deltas", lambda provider, events: openai_deltas("openai", events))
+    with serve(FailingOverHandler) as server:
+        write_config(project, endpoints={"openai": server.url + "/dies", "anthropic": server.url + "/works"},
+                     models={"anthropic": "claude"}, preferences={"failover": True})
+        text = apps.generate_app("make it", "---CODIGO--- sys", "demo")
+
+    assert text == SECOND
+    app = project / "my_apps" / "demo"
+    assert (app / "index.html").read_text() == "<html>\n<body>second</body>\n</html>"
+    assert not (app / ".index.partial.html").exists()
+    assert capsys.readouterr().out.count("[ASSISTANT SUGGESTS]") == 1
+
+def test_interrupt_removes_the_partial_file(project, monkeypatch):
+    def ask_ai(prompt, system_prompt, on_delta):
+        on_delta("---CODIGO---\n<html>\n<body>\n<h1>Half a page</h1>\n<p>still coming</p>\n")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(apps, "ask_ai", ask_ai)
+    with pytest.raises(KeyboardInterrupt):
+        apps.generate_app("make it", "sys", "demo")
+    app = project / "my_apps" / "demo"
+    assert app.is_dir() and list(app.iterdir()) == []